@@ -483,26 +483,25 @@ class ToDistributionModel:
             ignore_cache = True
             cache_path = None
 
-        # Figure out if the cache already exists and is valid
         else:
             cache_path = self.cache_dir / cache_fname
 
-            # Ignore cache if DVec was more recently modified
-            if cache_path.is_file():
-                dvec_modified_time = os.path.getmtime(dvector_path)
+        # Return the cache only if it's safe to, a missing cache
+        # file is found when trying to read it rather than checked first
+        if not ignore_cache:
+            try:
+                # Ignore cache if DVec was more recently modified
                 cache_modified_time = os.path.getmtime(cache_path)
-                if dvec_modified_time > cache_modified_time:
-                    ignore_cache = True
-
-        # Return the cache only if it's safe to
-        if cache_path is not None:
-            if not ignore_cache and cache_path.is_file():
-                LOG.debug("Loading trip ends from cache: %s", cache_path)
-                dvec = nd_core.DVector.load(cache_path)
-
-                # Do a few checks
-                if dvec.zoning_system == self.output_zoning:
-                    return dvec
+                dvec_modified_time = os.path.getmtime(dvector_path)
+                if dvec_modified_time <= cache_modified_time:
+                    LOG.debug("Loading trip ends from cache: %s", cache_path)
+                    dvec = nd_core.DVector.load(cache_path)
+
+                    # Do a few checks
+                    if dvec.zoning_system == self.output_zoning:
+                        return dvec
+            except FileNotFoundError:
+                pass
 
         # If here, we need to recreate the cache
         converted_dvec = self.read_and_convert_trip_end(
@@ -874,63 +874,68 @@ class DVector:
             dvec_chunk = {s: v for s, v, in zip(segments, vals)}
 
         else:
-            # Generate the data on a per segment basis
-            dvec_chunk = dict.fromkeys(df_chunk[self._segment_col].tolist())
-
-            for segment in df_chunk['segment'].unique():
-                # Get all available pop for this segment
-                seg_data = df_chunk[df_chunk[self._segment_col] == segment].copy()
-
-                # Check that it's a valid segment_name
-                if segment not in self.segmentation.segment_names:
-                    raise ValueError(
-                        "%s is not a valid segment name for a Dvector using %s "
-                        "segmentation.\n Data with segment:\n%s"
-                        % (segment, self.segmentation.name, seg_data)
-                    )
+            # Get the position of every row's segment and zone in one pass
+            seg_codes, segments = pd.factorize(df_chunk[self._segment_col])
+            zone_idx = pd.Index(self.zoning_system.unique_zones)
+            zone_pos = zone_idx.get_indexer(df_chunk[self._zone_col])
+
+            # Check that they're all valid segment names
+            invalid_segs = set(segments) - set(self.segmentation.segment_names)
+            if len(invalid_segs) > 0 or (seg_codes == -1).any():
+                segment = list(invalid_segs)[0] if len(invalid_segs) > 0 else np.nan
+                seg_data = df_chunk[df_chunk[self._segment_col].isin([segment])]
+                raise ValueError(
+                    "%s is not a valid segment name for a Dvector using %s "
+                    "segmentation.\n Data with segment:\n%s"
+                    % (segment, self.segmentation.name, seg_data)
+                )
 
-                # TODO(BT): There's a VERY slight chance that duplicate zones
-                #  could be split across processes. Need to add a check for
-                #  this on the calling function.
-                # Make sure there are no duplicate zones
-                seg_zones = seg_data[self._zone_col].tolist()
-                seg_zones_set = set(seg_zones)
-                if len(seg_zones_set) != len(seg_zones):
-                    raise ValueError(
-                        "The given DataFrame has one or more repeated values "
-                        "for some of the zones in segment %s. Found %s "
-                        "segments, but only %s of them are unique."
-                        % (segment, len(seg_zones), len(seg_zones_set))
-                    )
+            # TODO(BT): There's a VERY slight chance that duplicate zones
+            #  could be split across processes. Need to add a check for
+            #  this on the calling function.
+            # Make sure there are no duplicate zones
+            dupe_mask = df_chunk.duplicated([self._segment_col, self._zone_col]).to_numpy()
+            if dupe_mask.any():
+                segment = segments[seg_codes[dupe_mask][0]]
+                seg_zones = df_chunk.loc[
+                    df_chunk[self._segment_col] == segment, self._zone_col
+                ].tolist()
+                raise ValueError(
+                    "The given DataFrame has one or more repeated values "
+                    "for some of the zones in segment %s. Found %s "
+                    "segments, but only %s of them are unique."
+                    % (segment, len(seg_zones), len(set(seg_zones)))
+                )
 
-                # Make sure zones that don't exist in this zoning system are found
-                zoning_system_zones = set(self.zoning_system.unique_zones)
-                extra_zones = seg_zones_set - zoning_system_zones
-                if len(extra_zones) > 0:
-                    # Shortern the error message if long
-                    if len(extra_zones) > 10:
-                        extra_zones = list(extra_zones)
-                        extra_zones_str = (
-                            f"{extra_zones[:10]} plus {len(extra_zones) - 10} more"
-                        )
-                    else:
-                        extra_zones_str = f"{extra_zones}"
-
-                    raise ValueError(
-                        f"Found zones that don't exist in {self.zoning_system.name} "
-                        f"zoning in the given DataFrame.\n"
-                        f"For segment {segment}, the following zones do not "
-                        f"belong to this zoning system:\n"
-                        f"{extra_zones_str}"
+            # Make sure zones that don't exist in this zoning system are found
+            extra_mask = zone_pos == -1
+            if extra_mask.any():
+                segment = segments[seg_codes[extra_mask][0]]
+                seg_mask = extra_mask & (seg_codes == seg_codes[extra_mask][0])
+                extra_zones = set(df_chunk[self._zone_col].to_numpy()[seg_mask])
+
+                # Shortern the error message if long
+                if len(extra_zones) > 10:
+                    extra_zones = list(extra_zones)
+                    extra_zones_str = (
+                        f"{extra_zones[:10]} plus {len(extra_zones) - 10} more"
                     )
+                else:
+                    extra_zones_str = f"{extra_zones}"
 
-                # Filter down to just data as values, and zoning system as the index
-                seg_data = seg_data.reindex(columns=[self._zone_col, self._val_col])
-                seg_data = seg_data.set_index(self._zone_col)
+                raise ValueError(
+                    f"Found zones that don't exist in {self.zoning_system.name} "
+                    f"zoning in the given DataFrame.\n"
+                    f"For segment {segment}, the following zones do not "
+                    f"belong to this zoning system:\n"
+                    f"{extra_zones_str}"
+                )
 
-                # Infill any missing zones as 0
-                seg_data = seg_data.reindex(self.zoning_system.unique_zones, fill_value=0)
-                dvec_chunk[segment] = seg_data.values.flatten()
+            # Scatter the values into a segment x zone array, missing zones as 0
+            vals = df_chunk[self._val_col].to_numpy()
+            seg_zone_data = np.zeros((len(segments), len(zone_idx)), dtype=vals.dtype)
+            seg_zone_data[seg_codes, zone_pos] = vals
+            dvec_chunk = {seg: seg_zone_data[i] for i, seg in enumerate(segments)}
 
         return dvec_chunk
 
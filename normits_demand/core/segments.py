@@ -19,6 +19,7 @@ import os
 import math
 import pathlib
 import itertools
+import functools
 import collections
 import pathlib
 
@@ -2392,10 +2393,14 @@ def _get_valid_segments(name: str) -> pd.DataFrame:
     return df, naming_order, segment_types
 
 
+@functools.lru_cache(maxsize=None)
 def get_segmentation_level(name: str) -> SegmentationLevel:
     """
     Creates a SegmentationLevel for segmentation with name.
 
+    Segmentations are cached by name, so repeated calls return the same
+    SegmentationLevel rather than re-reading the segment definitions.
+
     Parameters
     ----------
     name:
@@ -2407,7 +2412,6 @@ def get_segmentation_level(name: str) -> SegmentationLevel:
         A SegmentationLevel object for segmentation with name
     """
     # TODO(BT): Add some validation on the segmentation name
-    # TODO(BT): Add some caching to this function!
     valid_segments, naming_order, segment_types = _get_valid_segments(name)
 
     # Create the SegmentationLevel object and return
@@ -19,6 +19,7 @@ import os
 import logging
 import warnings
 import itertools
+import functools
 import configparser
 
 from os import PathLike
@@ -885,10 +886,14 @@ def _get_zones(name: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarra
     return zone_names, zone_descs, internal_zones, external_zones
 
 
+@functools.lru_cache(maxsize=None)
 def get_zoning_system(name: str) -> ZoningSystem:
     """
     Creates a ZoningSystem for zoning with name.
 
+    Zoning systems are cached by name, so repeated calls return the same
+    ZoningSystem rather than re-reading the zone definitions.
+
     Parameters
     ----------
     name:
@@ -900,7 +905,6 @@ def get_zoning_system(name: str) -> ZoningSystem:
         A ZoningSystem object for zoning system with name
     """
     # TODO(BT): Add some validation on the zone name
-    # TODO(BT): Add some caching to this function!
     # Look for zone definitions
     zone_names, zone_desc, internal, external = _get_zones(name)
 
@@ -8,6 +8,7 @@
 from pathlib import Path
 import re
 import subprocess
+import tempfile
 
 # Third party imports
 
@@ -156,30 +157,25 @@ class CUBEMatConverter:
         out_file : str
             name of the output omx file.
         """
-        #create script path
-        script_path = Path(out_path / "Mat2OMX.s")
-
         # check files exists
         file_ops.check_file_exists(mat_file)
 
         to_write = f'convertmat from="{mat_file}" to="{out_path}\\{out_file}.omx" '\
             'format=omx compression=4'
-        with open(f"{out_path}\\Mat2OMX.s", "w") as file:
-            file.write(to_write)
-
-        #create commands
-        command = f'"{self.voyager_path.resolve()}" "{script_path}" '\
-            '-Pvdmi /Start /Hide /HideScript'
-        #run commands
-        subprocess.run(command, capture_output=True, check=False)
-        # Cleanup files
-        script_path.unlink()
-        script_path.with_name("TPPL.PRJ").unlink()
-        del_pat = re.compile(r"(vdmi.*)\.(prn|var)", re.I)
-        for path in script_path.parent.iterdir():
-            match = del_pat.match(path.name)
-            if match:
-                path.unlink()
+
+        # Script is written to its own folder so the CUBE project and print
+        # files don't clash with any other conversions running in out_path,
+        # the folder and all CUBE files in it are removed afterwards
+        with tempfile.TemporaryDirectory(dir=out_path) as script_dir:
+            script_path = Path(script_dir) / "Mat2OMX.s"
+            with open(script_path, "w") as file:
+                file.write(to_write)
+
+            #create commands
+            command = f'"{self.voyager_path.resolve()}" "{script_path}" '\
+                '-Pvdmi /Start /Hide /HideScript'
+            #run commands
+            subprocess.run(command, capture_output=True, check=False)
 
 def _stdout_decode(stdout: bytes) -> str:
     """Convert bytes to string starting with a newline, or return empty string."""
@@ -15,8 +15,11 @@ TODO: After integrations with TMS, combine with pa_to_od.py
 from __future__ import annotations
 
 # Built-Ins
+import os
+import re
 import pathlib
 import operator
+import itertools
 import functools
 
 from typing import Any
@@ -43,8 +46,7 @@ from normits_demand.utils import general as du
 from normits_demand.utils import file_ops
 from normits_demand.utils import math_utils
 
-# Can call tms pa_to_od.py functions from here
-from normits_demand.matrices.tms_pa_to_od import *
+from normits_demand.matrices.tms_pa_to_od import get_time_period_splits
 
 
 LOG = nd_log.get_logger(__name__)
@@ -166,13 +168,10 @@ def simplify_phi_factors(time_period_splits: pd.DataFrame):
         return time_period_splits
 
     # Build a mask where purposes match
-    unq_purpose = time_period_splits["purpose_from_home"].drop_duplicates()
-    keep_rows = np.array([False] * len(time_period_splits))
-    for p in unq_purpose:
-        purpose_mask = (time_period_splits["purpose_from_home"] == p) & (
-            time_period_splits["purpose_to_home"] == p
-        )
-        keep_rows = keep_rows | purpose_mask
+    keep_rows = (
+        time_period_splits["purpose_from_home"].to_numpy()
+        == time_period_splits["purpose_to_home"].to_numpy()
+    )
 
     time_period_splits = time_period_splits.loc[keep_rows]
 
@@ -257,20 +256,26 @@ def _build_tp_pa_internal(
 
     # ## Narrow tp_split down to just the segment here ## #
     segment_id = "soc" if purpose in consts.SOC_P else "ns"
-    segmentation_mask = du.get_segmentation_mask(
-        tp_splits,
-        col_vals={
-            "yr": year,
-            "p": purpose,
-            "m": mode,
-            segment_id: str(segment),
-            "ca": car_availability,
-        },
-        ignore_missing_cols=True,
-    )
+    col_vals = {
+        "yr": year,
+        "p": purpose,
+        "m": mode,
+        segment_id: str(segment),
+        "ca": car_availability,
+    }
+    segmentation_mask = np.ones(len(tp_splits), dtype=bool)
+    for col, val in col_vals.items():
+        if col in tp_splits.columns:
+            segmentation_mask &= (tp_splits[col] == val).to_numpy()
+
     tp_splits = tp_splits.loc[segmentation_mask]
     tp_splits = tp_splits.rename(columns={str(year): "tp_split_factor"})
 
+    # Undo the categorical segment columns now the frame is small
+    for col in ["soc", "ns"]:
+        if col in tp_splits.columns and tp_splits[col].dtype == "category":
+            tp_splits[col] = tp_splits[col].astype(str)
+
     # Drop either soc or ns, whichever is none is productions
     if pa_24hr["soc"].dtype == object and pa_24hr["soc"].unique()[0] == "none":
         pa_24hr = pa_24hr.drop(columns=["soc"])
@@ -294,40 +299,45 @@ def _build_tp_pa_internal(
     tp_splits = tp_splits.reindex(columns=index_cols)
     tp_splits = tp_splits.groupby(group_cols).sum().reset_index()
 
-    # ## Apply tp-split factors to total pa_24hr ## #
-    unq_time = tp_splits["tp"].drop_duplicates()
-    for time in unq_time:
-        # Left join to make sure we don't drop any demand
-        time_factors = tp_splits[tp_splits["tp"] == time]
-        tp_split_pa = pd.merge(pa_24hr, time_factors, on=merge_cols, how="left")
+    # ## Attach the tp-split factors for every time period at once ## #
+    # One column of factors per time period
+    tp_factors = tp_splits.pivot(index=merge_cols, columns="tp", values="tp_split_factor")
+    unq_time = tp_factors.columns
 
-        # Fill in any NaNs from the left join
-        tp_split_pa["tp_split_factor"] = tp_split_pa["tp_split_factor"].fillna(0)
-        tp_split_pa["tp"] = tp_split_pa["tp"].fillna(time).astype(int)
+    # Look up each row's factors on the index, rather than a merge.
+    # Acts as a left join, so no demand is dropped. Fill in any NaNs
+    if tp_factors.index.nlevels > 1:
+        row_keys = pd.MultiIndex.from_frame(pa_24hr[merge_cols])
+    else:
+        row_keys = pd.Index(pa_24hr[merge_cols[0]])
+    row_factors = tp_factors.reindex(row_keys).fillna(0).to_numpy()
+    trips = pa_24hr["trips"].to_numpy()
 
-        # Calculate the number of trips for this time_period
-        tp_split_pa["trips"] *= tp_split_pa["tp_split_factor"]
+    # ## Apply tp-split factors to total pa_24hr ## #
+    seg_cols = du.list_safe_remove(merge_cols, [in_zone_col])
+    index_cols = [in_zone_col, out_zone_col] + seg_cols
+    # Only the tp changes in the output names
+    base_tp_pa_name = du.get_dist_name(
+        str(trip_origin),
+        str(matrix_format),
+        str(year),
+        str(purpose),
+        str(mode),
+        str(segment),
+        str(car_availability),
+    )
 
-        # ## Aggregate back up to our segmentation ## #
-        seg_cols = du.list_safe_remove(merge_cols, [in_zone_col])
-        group_cols = [in_zone_col, out_zone_col] + seg_cols + ["tp"]
-        index_cols = group_cols.copy() + ["trips"]
+    # pa_24hr came from a single matrix, so there's one row per zone pair
+    # and no need to aggregate back up to our segmentation
+    tp_split_pa = pa_24hr.reindex(columns=index_cols)
 
-        tp_split_pa = tp_split_pa.reindex(columns=index_cols)
-        tp_split_pa = tp_split_pa.groupby(group_cols).sum().reset_index()
+    for i, time in enumerate(unq_time):
+        # Calculate the number of trips for this time_period
+        tp_split_pa["tp"] = int(time)
+        tp_split_pa["trips"] = trips * row_factors[:, i]
 
         # Build write path
-        tp_pa_name = du.get_dist_name(
-            str(trip_origin),
-            str(matrix_format),
-            str(year),
-            str(purpose),
-            str(mode),
-            str(segment),
-            str(car_availability),
-            tp=str(time),
-        )
-        tp_pa_fname = tp_pa_name + ".csv"
+        tp_pa_fname = "%s_tp%s.csv" % (base_tp_pa_name, time)
         out_tp_pa_path = os.path.join(pa_export, tp_pa_fname)
 
         # Convert table from long to wide format and save
@@ -422,13 +432,32 @@ def efs_build_tp_pa(
     ns_needed = [None] if ns_needed is None else ns_needed
     ca_needed = [None] if ca_needed is None else ca_needed
 
+    # Compact the segmentation columns so they are cheap to mask and group on
+    tp_splits = tp_splits.copy()
+    for col in [model_zone_col, "p", "m", "ca", "tp"]:
+        if col in tp_splits.columns and pd.api.types.is_integer_dtype(tp_splits[col]):
+            tp_splits[col] = pd.to_numeric(tp_splits[col], downcast="integer")
+
+    for col in ["soc", "ns"]:
+        if col in tp_splits.columns:
+            tp_splits[col] = tp_splits[col].astype(str).astype("category")
+
+    # Split the tp_splits by purpose and mode once, rather than in every
+    # call. Keeps the data pickled out to each process small too
+    pm_tp_splits = dict()
+    for p, m in itertools.product(p_needed, m_needed):
+        pm_mask = np.ones(len(tp_splits), dtype=bool)
+        for col, val in {"p": p, "m": m}.items():
+            if col in tp_splits.columns:
+                pm_mask &= (tp_splits[col] == val).to_numpy()
+        pm_tp_splits[(p, m)] = tp_splits.loc[pm_mask].reset_index(drop=True)
+
     # ## MULTIPROCESS ## #
     unchanging_kwargs = {
         "pa_import": pa_import,
         "pa_export": pa_export,
         "matrix_format": matrix_format,
         "model_name": model_name,
-        "tp_splits": tp_splits,
         "model_zone_col": model_zone_col,
         "round_dp": round_dp,
     }
@@ -443,7 +472,14 @@ def efs_build_tp_pa(
         for p, m, seg, ca in loop_generator:
             kwargs = unchanging_kwargs.copy()
             kwargs.update(
-                {"year": year, "purpose": p, "mode": m, "segment": seg, "car_availability": ca}
+                {
+                    "tp_splits": pm_tp_splits[(p, m)],
+                    "year": year,
+                    "purpose": p,
+                    "mode": m,
+                    "segment": seg,
+                    "car_availability": ca,
+                }
             )
             kwargs_list.append(kwargs)
 
@@ -453,17 +489,106 @@ def efs_build_tp_pa(
     )
 
 
+class _ReadSquareMatrixThread(multithreading.ReturnOrErrorThread):
+    """Thread for reading a square matrix csv into a numpy array"""
+
+    def __init__(self, path: str) -> None:
+        multithreading.ReturnOrErrorThread.__init__(self)
+        self.path = path
+
+    def run_target(self) -> np.ndarray:
+        """Reads the matrix at self.path, zone column included"""
+        try:
+            return np.loadtxt(self.path, delimiter=",", skiprows=1, ndmin=2)
+        except ValueError as error:
+            raise ValueError(
+                "Cannot read %s as a numeric matrix. The zone ids and "
+                "all the values need to be numbers." % self.path
+            ) from error
+
+
+def _zone_nums_from_col(zone_col: np.ndarray, path: str) -> np.ndarray:
+    """Converts a zone column read in as floats to integer zone numbers
+
+    Raises a ValueError if any of the zone ids aren't whole numbers, rather
+    than silently truncating them.
+    """
+    zone_nums = zone_col.astype(np.int64)
+    if not np.array_equal(zone_nums, zone_col):
+        bad_zones = zone_col[zone_nums != zone_col]
+        raise ValueError(
+            "Zone ids need to be integers to write the OD matrices, but "
+            "%s contains non-integer zone ids: %s" % (path, bad_zones[:5].tolist())
+        )
+    return zone_nums
+
+
+def _write_od_matrix(
+    matrix: np.ndarray,
+    path: str,
+    zone_nums: np.ndarray,
+    model_zone_col: str,
+    round_dp: int,
+    binary_output: bool = False,
+) -> None:
+    """
+    Writes a square OD matrix to disk, without going through pandas
+
+    Parameters
+    ----------
+    matrix:
+        The square matrix to write out. Rows and columns should be in the
+        same order as zone_nums.
+
+    path:
+        The path to write matrix to. If binary_output is True, the suffix
+        is swapped for '.npy'.
+
+    zone_nums:
+        The zone numbers of the rows and columns of matrix. Used to build
+        the row and column names of the csv output.
+
+    model_zone_col:
+        The name to give the zone column in the csv output.
+
+    round_dp:
+        The number of decimal places to round the output values to.
+
+    binary_output:
+        Whether to write matrix as a binary '.npy' file instead of a csv.
+        The zone numbers are not stored in the '.npy' file.
+
+    Returns
+    -------
+    None
+    """
+    matrix = np.round(matrix, decimals=round_dp)
+
+    if binary_output:
+        np.save(str(pathlib.Path(path).with_suffix(".npy")), matrix)
+        return
+
+    header = [model_zone_col] + [str(x) for x in zone_nums]
+    np.savetxt(
+        path,
+        np.column_stack([zone_nums, matrix]),
+        fmt=["%d"] + ["%.15g"] * matrix.shape[1],
+        delimiter=",",
+        header=",".join(header),
+        comments="",
+    )
+
+
 def _build_od_internal(
     pa_import,
     od_export,
     model_name,
     calib_params,
-    phi_lookup_folder,
-    phi_type,
-    aggregate_to_wday,
+    phi_factors,
     round_dp,
     full_od_out=False,
     echo=True,
+    binary_output=False,
 ):
     """
     The internals of build_od(). Useful for making the code more
@@ -492,112 +617,90 @@ def _build_od_internal(
     dist_name = du.calib_params_to_dist_name("hb", "od", calib_params)
     print("Generating %s..." % dist_name)
 
-    # Get appropriate phis and filter
-    phi_factors = get_time_period_splits(
-        mode, phi_type, aggregate_to_wday=aggregate_to_wday, lookup_folder=phi_lookup_folder
-    )
-    phi_factors = simplify_phi_factors(phi_factors)
+    # Filter the mode's simplified phis down to this purpose
     phi_factors = phi_factors[phi_factors["purpose_from_home"] == purpose]
 
-    # Get the relevant filenames from the dir
-    dir_subset = dir_contents.copy()
+    # Build a pattern matching all calib_params, capturing the tp
+    param_patterns = list()
     for name, param in calib_params.items():
         # Work around for 'p2' clashing with 'tp2'
-        if name == "p":
-            dir_subset = [x for x in dir_subset if "_" + name + str(param) in x]
-        else:
-            dir_subset = [x for x in dir_subset if (name + str(param)) in x]
+        prefix = "_" if name == "p" else ""
+        param_patterns.append("(?=.*%s)" % re.escape(prefix + name + str(param)))
+    pattern = re.compile("".join(param_patterns) + ".*(%s)" % "|".join(tps))
 
-    # Build dict of tp names to filenames
+    # Build dict of tp names to filenames in a single pass of the dir
     tp_names = {}
+    for fname in dir_contents:
+        match = pattern.match(fname)
+        if match is not None:
+            tp_names.setdefault(match.group(1), fname)
+
+    missing_tps = [tp for tp in tps if tp not in tp_names]
+    if missing_tps != list():
+        raise ValueError(
+            "Could not find PA matrices for all time periods.\n"
+            "Looking for: %s\n"
+            "Missing time periods: %s" % (str(calib_params), str(missing_tps))
+        )
+
+    # ## Build a (tp, zone, zone) array from imported from_home PA ## #
+    # Read straight to numpy, the header is rebuilt from the zone col on write.
+    # Read in threads, so the reads overlap
+    read_threads = list()
     for tp in tps:
-        tp_names.update({tp: [x for x in dir_subset if tp in x][0]})
+        thread = _ReadSquareMatrixThread(os.path.join(pa_import, tp_names[tp]))
+        thread.start()
+        read_threads.append(thread)
+    dists = multithreading.wait_for_thread_return_or_error(read_threads)
 
-    # ## Build from_home dict from imported from_home PA ## #
-    frh_dist = {}
-    for tp, path in tp_names.items():
-        dist_df = pd.read_csv(os.path.join(pa_import, path))
-        zone_nums = dist_df[model_zone_col]  # Save to re-attach later
-        dist_df = dist_df.drop(model_zone_col, axis=1)
-        frh_dist.update({tp: dist_df})
+    # Save to re-attach later
+    zone_nums = _zone_nums_from_col(dists[0][:, 0], os.path.join(pa_import, tp_names[tps[0]]))
+    frh_dist = np.stack([dist[:, 1:] for dist in dists])
+    del dists
 
     # ## Build to_home matrices from the from_home PA ## #
-    frh_ph = {}
-    for tp_frh in tps:
-        du.print_w_toggle("From from_h " + str(tp_frh), verbose=echo)
-        frh_int = int(tp_frh.replace("tp", ""))
-        phi_frh = phi_factors[phi_factors["time_from_home"] == frh_int]
-
-        # Transpose to flip P & A
-        frh_base = frh_dist[tp_frh].copy()
-        frh_base = frh_base.values.T
-
-        toh_dists = {}
-        for tp_toh in tps:
-            # Get phi
-            du.print_w_toggle("\tBuilding to_h " + str(tp_toh), verbose=echo)
-            toh_int = int(tp_toh.replace("tp", ""))
-            phi_toh = phi_frh[phi_frh["time_to_home"] == toh_int]
-            phi_toh = phi_toh["direction_factor"]
-
-            # Cast phi toh
-            phi_mat = np.broadcast_to(phi_toh, (len(frh_base), len(frh_base)))
-            tp_toh_mat = frh_base * phi_mat
-            toh_dists.update({tp_toh: tp_toh_mat})
-        frh_ph.update({tp_frh: toh_dists})
-
-    # ## Aggregate to_home matrices by time period ## #
-    # removes the from_home splits
-    tp1_list = list()
-    tp2_list = list()
-    tp3_list = list()
-    tp4_list = list()
-    for item, toh_dict in frh_ph.items():
-        for toh_tp, toh_dat in toh_dict.items():
-            if toh_tp == "tp1":
-                tp1_list.append(toh_dat)
-            elif toh_tp == "tp2":
-                tp2_list.append(toh_dat)
-            elif toh_tp == "tp3":
-                tp3_list.append(toh_dat)
-            elif toh_tp == "tp4":
-                tp4_list.append(toh_dat)
-
-    toh_dist = {
-        "tp1": np.sum(tp1_list, axis=0),
-        "tp2": np.sum(tp2_list, axis=0),
-        "tp3": np.sum(tp3_list, axis=0),
-        "tp4": np.sum(tp4_list, axis=0),
-    }
+    # Build a (from_home, to_home) matrix of phi factors
+    # One scalar factor per pair, so no need to broadcast to matrices
+    tp_nums = [int(tp.replace("tp", "")) for tp in tps]
+    phi_matrix = phi_factors.pivot(
+        index="time_from_home",
+        columns="time_to_home",
+        values="direction_factor",
+    )
+    phi_matrix = phi_matrix.reindex(index=tp_nums, columns=tp_nums)
+    phi_matrix = phi_matrix.to_numpy(dtype=np.float64)
+
+    if np.isnan(phi_matrix).any():
+        raise ValueError(
+            "Phi factors are missing for some from_home and to_home time "
+            "period pairs.\n"
+            "Purpose: %s\n"
+            "Mode: %s" % (purpose, mode)
+        )
+
+    # Split each from_home tp into to_home tps, summing over from_home.
+    # Contract in the stored layout, then flip P & A into a C-contiguous
+    # array. A transposed einsum hands back strided views instead
+    du.print_w_toggle("Building to_home matrices", verbose=echo)
+    toh_dist = np.einsum("fij,ft->tij", frh_dist, phi_matrix)
+    toh_dist = np.ascontiguousarray(toh_dist.transpose(0, 2, 1))
 
     # ## Output the from_home and to_home matrices ## #
-    for tp in tps:
+    writing_threads = list()
+    for i, tp in enumerate(tps):
         # Get output matrices
         output_name = tp_names[tp]
 
-        output_from = frh_dist[tp]
-        from_total = output_from.sum().sum()
+        output_from_arr = frh_dist[i]
+        from_total = output_from_arr.sum()
         output_from_name = output_name.replace("pa", "od_from")
 
-        output_to = toh_dist[tp]
-        to_total = output_to.sum().sum()
+        output_to_arr = toh_dist[i]
+        to_total = output_to_arr.sum()
         output_to_name = output_name.replace("pa", "od_to")
 
-        # ## Gotta fudge the row/column names ## #
-        # Add the zone_nums back on
-        output_from = pd.DataFrame(output_from).reset_index()
-        # noinspection PyUnboundLocalVariable
-        output_from["index"] = zone_nums
-        output_from.columns = [model_zone_col] + zone_nums.tolist()
-        output_from = output_from.set_index(model_zone_col)
-
-        output_to = pd.DataFrame(output_to).reset_index()
-        output_to["index"] = zone_nums
-        output_to.columns = [model_zone_col] + zone_nums.tolist()
-        output_to = output_to.set_index(model_zone_col)
-
-        # With columns fixed, created full OD output
-        output_od = output_from + output_to
+        # Create full OD output
+        output_od_arr = output_from_arr + output_to_arr
         output_od_name = output_name.replace("pa", "od")
 
         du.print_w_toggle("Exporting " + output_from_name, verbose=echo)
@@ -611,24 +714,37 @@ def _build_od_internal(
         output_to_path = os.path.join(od_export, output_to_name)
         output_od_path = os.path.join(od_export, output_od_name)
 
-        # Round the outputs
-        output_from = output_from.round(decimals=round_dp)
-        output_to = output_to.round(decimals=round_dp)
-        output_od = output_od.round(decimals=round_dp)
-
         # BACKLOG: Add tidality checks into efs_build_od()
         #  labels: demand merge, audits, EFS
         # Auditing checks - tidality
         # OD from = PA
         # OD to = if it leaves it should come back
         # OD = 2(PA)
-        output_from.to_csv(output_from_path)
-        output_to.to_csv(output_to_path)
+        write_kwargs = {
+            "zone_nums": zone_nums,
+            "model_zone_col": model_zone_col,
+            "round_dp": round_dp,
+            "binary_output": binary_output,
+        }
+        to_write = [(output_from_arr, output_from_path), (output_to_arr, output_to_path)]
         if full_od_out:
-            output_od.to_csv(output_od_path)
+            to_write.append((output_od_arr, output_od_path))
+
+        # Write in threads, so the writes overlap each other and the next tp
+        for mat, path in to_write:
+            thread = multithreading.ReturnOrErrorThread(
+                target=_write_od_matrix,
+                args=(mat, path),
+                kwargs=write_kwargs,
+            )
+            thread.start()
+            writing_threads.append(thread)
 
         matrix_totals.append([output_name, from_total, to_total])
 
+    # Wait for all the threads to finish
+    multithreading.wait_for_thread_return_or_error(writing_threads)
+
     return matrix_totals
 
 
@@ -648,6 +764,7 @@ def efs_build_od(
     verbose: bool = True,
     round_dp: int = consts.DEFAULT_ROUNDING,
     process_count: int = consts.PROCESS_COUNT,
+    binary_output: bool = False,
 ) -> None:
     """
      This function imports time period split factors from a given path.
@@ -677,6 +794,10 @@ def efs_build_od(
         use multiprocessing at all. Set to -1 to use all expect 1 available
         CPU.
 
+    binary_output:
+        Whether to write the OD matrices as binary '.npy' files instead of
+        csvs. Much faster to write, but the zone numbers are not kept.
+
     Returns
     -------
     None
@@ -688,16 +809,22 @@ def efs_build_od(
     if phi_lookup_folder is None:
         phi_lookup_folder = "I:/NorMITs Demand/import/phi_factors"
 
+    # The phis only depend on the mode, so only read them in once each
+    mode_phi_factors = dict()
+    for m in m_needed:
+        phi_factors = get_time_period_splits(
+            m, phi_type, aggregate_to_wday=aggregate_to_wday, lookup_folder=phi_lookup_folder
+        )
+        mode_phi_factors[m] = simplify_phi_factors(phi_factors)
+
     # ## MULTIPROCESS ## #
     unchanging_kwargs = {
         "pa_import": pa_import,
         "od_export": od_export,
         "model_name": model_name,
-        "phi_lookup_folder": phi_lookup_folder,
-        "phi_type": phi_type,
-        "aggregate_to_wday": aggregate_to_wday,
         "round_dp": round_dp,
         "echo": verbose,
+        "binary_output": binary_output,
     }
 
     # Build a list of the changing arguments
@@ -711,7 +838,10 @@ def efs_build_od(
             calib_params["yr"] = year
             kwargs = unchanging_kwargs.copy()
             kwargs.update(
-                {"calib_params": calib_params,}
+                {
+                    "calib_params": calib_params,
+                    "phi_factors": mode_phi_factors[calib_params["m"]],
+                }
             )
             kwargs_list.append(kwargs)
 
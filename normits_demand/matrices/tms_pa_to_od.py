@@ -202,23 +202,16 @@ def get_production_time_split(productions,
     productions : production vector
     model_zone : col name
     """
-    p_totals = productions.reindex(
-        [model_zone, 'trips'], axis=1).groupby(
-            model_zone).sum().reset_index()
-    p_totals = p_totals.rename(columns={'trips':'p_totals'})
-    tp_totals = productions.reindex(
+    time_splits = productions.reindex(
         [model_zone,
         'tp',
         'trips'],
         axis=1).groupby(
             [model_zone,
             'tp']).sum().reset_index()
-    time_splits = tp_totals.merge(p_totals,
-                                    how='left',
-                                    on=[model_zone])
-    time_splits['time_split'] = (time_splits['trips']/time_splits['p_totals'])
-    time_splits = time_splits.drop(['p_totals'], axis=1)
-  
+    p_totals = time_splits.groupby(model_zone)['trips'].transform('sum')
+    time_splits['time_split'] = (time_splits['trips']/p_totals)
+
     return time_splits
         
         
@@ -276,6 +269,10 @@ def build_tp_pa(file_drive = _default_file_drive,
 
     tp_pa_builds = init_params.index
 
+    # Work out time split
+    # This won't work if there are duplicates
+    time_splits = get_production_time_split(productions, model_zone)
+
     tp_pa_path = (o_paths['pa'] +
                   '/hb_pa')
 
@@ -294,10 +291,6 @@ def build_tp_pa(file_drive = _default_file_drive,
         #     if cp != 'none':
         #         p_subset = p_subset[p_subset[index]==cp]
 
-        # Work out time split
-        # This won't work if there are duplicates
-        time_splits = get_production_time_split(productions, model_zone)
-
         ts_ph = time_splits.copy()
         for cp, name in calib_params.items():
             print(cp, name)
@@ -716,7 +709,8 @@ def build_od(file_drive = _default_file_drive,
                     axis=1)})
 
         # To build each toh matrix
-        frh_ph = {}
+        # Accumulate in place, rather than keeping every frh/toh matrix
+        toh_dist = {}
         for tp_frh in tps:
             print('From frh ' + str(tp_frh))
             frh_int = int(tp_frh.replace('tp',''))
@@ -726,7 +720,6 @@ def build_od(file_drive = _default_file_drive,
             # Transpose to flip P & A
             frh_base = frh_base.values.T
 
-            toh_dists = {}
             for tp_toh in tps:
                 # Get phi
                 print('Building ' + str(tp_toh))
@@ -739,33 +732,12 @@ def build_od(file_drive = _default_file_drive,
                                           (len(frh_base),
                                            len(frh_base)))
                 tp_toh_mat = frh_base * phi_mat
-                toh_dists.update({tp_toh:tp_toh_mat})
-            frh_ph.update({tp_frh:toh_dists})
-
-        # Go back over frh_ph and aggregate time period
-        tp1_list = []
-        tp2_list = []
-        tp3_list = []
-        tp4_list = []
-
-        for item, toh_dict in frh_ph.items():
-            print('From home ' + item)
-            for toh_tp, toh_dat in toh_dict.items():
-                print(toh_tp)
-                if toh_tp == 'tp1':
-                    tp1_list.append(toh_dat)
-                elif toh_tp == 'tp2':
-                    tp2_list.append(toh_dat)
-                elif toh_tp == 'tp3':
-                    tp3_list.append(toh_dat)
-                elif toh_tp == 'tp4':
-                    tp4_list.append(toh_dat)
-        
-        toh_dist = {}
-        toh_dist.update({'tp1':np.sum(tp1_list, axis=0)})
-        toh_dist.update({'tp2':np.sum(tp2_list, axis=0)})
-        toh_dist.update({'tp3':np.sum(tp3_list, axis=0)})
-        toh_dist.update({'tp4':np.sum(tp4_list, axis=0)})
+
+                # Aggregate by to home time period
+                if tp_toh in toh_dist:
+                    toh_dist[tp_toh] += tp_toh_mat
+                else:
+                    toh_dist[tp_toh] = tp_toh_mat
 
         for tp in tps:
             output_from = frh_dist[tp]
@@ -1468,14 +1440,10 @@ def simplify_time_period_splits(time_period_splits: pd.DataFrame):
         return time_period_splits
 
     # Build a mask where purposes match
-    unq_purpose = time_period_splits['purpose_from_home'].drop_duplicates()
-    keep_rows = np.array([False] * len(time_period_splits))
-    for p in unq_purpose:
-        purpose_mask = (
-            (time_period_splits['purpose_from_home'] == p)
-            & (time_period_splits['purpose_to_home'] == p)
-        )
-        keep_rows = keep_rows | purpose_mask
+    keep_rows = (
+        time_period_splits['purpose_from_home'].to_numpy()
+        == time_period_splits['purpose_to_home'].to_numpy()
+    )
 
     time_period_splits = time_period_splits.loc[keep_rows]
 
@@ -572,6 +572,15 @@ class DistributionModel(DistributionModelExportPaths):
             to_zoning_system=self.compile_zoning_system,
             weight_col_name=translation_weight_col
         )
+        translator = translation.ZoneTranslator(
+            row_translation=pop_trans,
+            col_translation=emp_trans,
+            from_zone_col=current_zoning.col_name,
+            to_zone_col=self.compile_zoning_system.col_name,
+            factors_col=translation_weight_col,
+            from_unique_zones=current_zoning.unique_zones,
+            to_unique_zones=self.compile_zoning_system.unique_zones,
+        )
 
         desc = "Translating matrices for compilation"
         total = len(self.running_segmentation)
@@ -588,16 +597,7 @@ class DistributionModel(DistributionModelExportPaths):
             df.columns = df.columns.astype(df.index.dtype)
 
             # Translate
-            df = translation.pandas_matrix_zone_translation(
-                matrix=df,
-                row_translation=pop_trans,
-                col_translation=emp_trans,
-                from_zone_col=current_zoning.col_name,
-                to_zone_col=self.compile_zoning_system.col_name,
-                factors_col=translation_weight_col,
-                from_unique_zones=current_zoning.unique_zones,
-                to_unique_zones=self.compile_zoning_system.unique_zones,
-            )
+            df = translator.translate(matrix=df)
 
             # Write new matrix out
             file_ops.write_df(df, os.path.join(out_dir, fname))
@@ -1945,36 +1945,18 @@ def get_production_time_split(productions,
     if tp_col in non_split_cols:
         seg_cols = du.list_safe_remove(non_split_cols, [tp_col])
     else:
-        seg_cols = non_split_cols.sopy()
+        seg_cols = non_split_cols.copy()
 
-    # Get the totals per zone
-    group_cols = seg_cols
-    index_cols = group_cols.copy() + data_cols
-
-    p_totals = productions.reindex(columns=index_cols)
-    p_totals = p_totals.groupby(group_cols).sum().reset_index()
-
-    # Get tp splits per zone
+    # Get tp totals per zone
     group_cols = seg_cols + [tp_col]
     index_cols = group_cols.copy() + data_cols
 
-    tp_totals = productions.reindex(columns=index_cols)
-    tp_totals = tp_totals.groupby(group_cols).sum().reset_index()
-
-    # Avoid name clashes on merge
-    rename_cols = {col: '%s_total' % col for col in data_cols}
-    p_totals = p_totals.rename(columns=rename_cols)
-
-    time_splits = pd.merge(
-        tp_totals,
-        p_totals,
-        how='left',
-        on=seg_cols,
-    )
+    time_splits = productions.reindex(columns=index_cols)
+    time_splits = time_splits.groupby(group_cols).sum().reset_index()
 
     # Calculate time splits per zone for each data col
-    for col in data_cols:
-        time_splits[col] /= time_splits['%s_total' % col]
-        time_splits = time_splits.drop(columns=['%s_total' % col])
+    time_splits[data_cols] = time_splits[data_cols].astype(np.float64)
+    p_totals = time_splits.groupby(seg_cols)[data_cols].transform('sum')
+    time_splits[data_cols] /= p_totals
 
     return time_splits
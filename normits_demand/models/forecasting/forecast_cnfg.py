@@ -1,7 +1,9 @@
 """Config files and options for `run_forecast`."""
 import enum
+import re
+import string
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 import pydantic
 
@@ -16,6 +18,23 @@ EXPORT_PATH_FORMAT = (
 )
 
 
+def _format_field_names(fmt: str, fields: Iterable[str]) -> tuple[str, ...]:
+    """Get the replacement field names in `fmt` which are in `fields`.
+
+    Only the first part of a field name is used, so attribute and
+    index fields e.g. "{import_path.name}" or "{future_years[0]}"
+    give the name of the object they're looked up on.
+    """
+    fields = set(fields)
+    names = {}
+    for _, field, _, _ in string.Formatter().parse(fmt):
+        match = re.match(r"[^.\[]+", field or "")
+        if match is not None and match.group() in fields:
+            names[match.group()] = None
+
+    return tuple(names)
+
+
 class ForecastModel(nd_enum.IsValidEnumWithAutoNameLower):
     """Forecasting models available."""
 
@@ -44,19 +63,35 @@ class ForecastParameters(config_base.BaseConfig):
     output_trip_end_data: bool = False
     output_trip_end_growth: bool = False
 
+    # Derived paths are checked on first access then stored
+    _pa_to_od_factors = pydantic.PrivateAttr(None)
+    _car_occupancies_path = pydantic.PrivateAttr(None)
+    _export_path_fields = pydantic.PrivateAttr(None)
+
+    class Config:
+        """Parameters can't be changed once loaded, so stored paths stay valid."""
+
+        frozen = True
+
     def _build_export_path(
         self, forecast_model: str, forecast_version: str, forecast_scenario: str
     ) -> Path:
-        """Build export path from `export_path_fmt`."""
-        return Path(
-            self.export_path_fmt.format(
-                forecast_model=forecast_model,
-                forecast_version=forecast_version,
-                scenario=forecast_scenario,
-                mode=self.assignment_model.get_mode().get_name(),
-                **self.dict(),
-            )
+        """Build export path from `export_path_fmt`.
+
+        The attribute names used in `export_path_fmt` are found on the
+        first call, so only those attributes are looked up to fill it in.
+        """
+        if self._export_path_fields is None:
+            self._export_path_fields = _format_field_names(self.export_path_fmt, dict(self))
+
+        values = {name: getattr(self, name) for name in self._export_path_fields}
+        values.update(
+            forecast_model=forecast_model,
+            forecast_version=forecast_version,
+            scenario=forecast_scenario,
+            mode=self.assignment_model.get_mode().get_name(),
         )
+        return Path(self.export_path_fmt.format_map(values))
 
     @property
     def export_path(self) -> Path:
@@ -73,6 +108,9 @@ class ForecastParameters(config_base.BaseConfig):
         Paths to the PA to OD tour proportions, has
         keys `post_me_tours` and `post_me_fh_th_factors`.
         """
+        if self._pa_to_od_factors is not None:
+            return dict(self._pa_to_od_factors)
+
         # TODO(MB) Add flexibility to how it finds the tour proportions
         tour_prop_home = Path(
             self.import_path
@@ -83,20 +121,27 @@ class ForecastParameters(config_base.BaseConfig):
             "post_me_tours": tour_prop_home,
             "post_me_fh_th_factors": tour_prop_home / "fh_th_factors",
         }
-        for nm, p in paths.items():
-            if not p.is_dir():
-                raise NotADirectoryError(f"cannot find {nm} folder: {p}")
-        return paths
+        # The factors folder is inside the tours folder, so the tours
+        # folder only needs checking when the factors folder isn't found
+        if not paths["post_me_fh_th_factors"].is_dir():
+            for nm, p in paths.items():
+                if not p.is_dir():
+                    raise NotADirectoryError(f"cannot find {nm} folder: {p}")
+
+        self._pa_to_od_factors = paths
+        return dict(paths)
 
     @property
     def car_occupancies_path(self) -> Path:
         """Path
         Path to the vehicle occupancies CSV file.
         """
-        path = self.import_path / "vehicle_occupancies/car_vehicle_occupancies.csv"
-        if not path.exists():
-            raise FileNotFoundError(f"cannot find vehicle occupancies CSV: {path}")
-        return path
+        if self._car_occupancies_path is None:
+            path = self.import_path / "vehicle_occupancies/car_vehicle_occupancies.csv"
+            if not path.exists():
+                raise FileNotFoundError(f"cannot find vehicle occupancies CSV: {path}")
+            self._car_occupancies_path = path
+        return self._car_occupancies_path
 
 
 class TEMForecastParameters(ForecastParameters):
@@ -228,6 +273,7 @@ class EDGEParameters(config_base.BaseConfig):
     edge_growth_dir: Path
 
     _export_path_fmt: str = pydantic.PrivateAttr(EXPORT_PATH_FORMAT)
+    _export_path_fields = pydantic.PrivateAttr(None)
 
     @classmethod
     @pydantic.validator("edge_growth_dir", "matrices_to_grow_dir")
@@ -278,14 +324,16 @@ class EDGEParameters(config_base.BaseConfig):
     @property
     def export_path(self) -> Path:
         """Build export path from `export_path_fmt`."""
-        return Path(
-            self._export_path_fmt.format(
-                forecast_model=ForecastModel.EDGE.value,
-                scenario=self.forecast_scenario,
-                mode=self.assignment_model.get_mode().get_name(),
-                **self.dict(),
-            )
+        if self._export_path_fields is None:
+            self._export_path_fields = _format_field_names(self._export_path_fmt, dict(self))
+
+        values = {name: getattr(self, name) for name in self._export_path_fields}
+        values.update(
+            forecast_model=ForecastModel.EDGE.value,
+            scenario=self.forecast_scenario,
+            mode=self.assignment_model.get_mode().get_name(),
         )
+        return Path(self._export_path_fmt.format_map(values))
 
 
 # TODO(MB) Function to create an example config file
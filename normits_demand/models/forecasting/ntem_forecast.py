@@ -54,6 +54,13 @@ class NTEMImportMatrices:
     """
 
     SEGMENTATION = {"hb": "hb_p_m", "nhb": "nhb_p_m"}
+    # Segmentation for each of the `TEMProTripEnds` attributes
+    TRIP_END_SEGMENTATION = {
+        "hb_attractions": SEGMENTATION["hb"],
+        "hb_productions": SEGMENTATION["hb"],
+        "nhb_attractions": SEGMENTATION["nhb"],
+        "nhb_productions": SEGMENTATION["nhb"],
+    }
 
     def __init__(self, matrix_folder: Path, year: int, model: nd.AssignmentModel) -> None:
         self.year = int(year)
@@ -895,15 +902,7 @@ def get_tempro_data(
     # Read data and convert to DVectors
     trip_ends = tempro_data.produce_dvectors()
     # Aggregate DVector to required segmentation
-    segmentation = NTEMImportMatrices.SEGMENTATION
-    return trip_ends.aggregate(
-        {
-            "hb_attractions": segmentation["hb"],
-            "hb_productions": segmentation["hb"],
-            "nhb_attractions": segmentation["nhb"],
-            "nhb_productions": segmentation["nhb"],
-        }
-    )
+    return trip_ends.aggregate(NTEMImportMatrices.TRIP_END_SEGMENTATION)
 
 
 def model_mode_subset(
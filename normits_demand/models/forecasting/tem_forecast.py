@@ -5,7 +5,6 @@
 
 ##### IMPORTS #####
 # Standard imports
-import os
 from pathlib import Path
 
 # Third party imports
@@ -13,6 +12,7 @@ from pathlib import Path
 # Local imports
 import normits_demand as nd
 from normits_demand import logging as nd_log
+from normits_demand.concurrency import multithreading
 from normits_demand.models.forecasting import tempro_trip_ends
 
 ##### CONSTANTS #####
@@ -20,6 +20,18 @@ LOG = nd_log.get_logger(__name__)
 
 
 ##### CLASSES #####
+class _LoadDVectorThread(multithreading.ReturnOrErrorThread):
+    """Thread for loading a pickled DVector from disk"""
+
+    def __init__(self, path: Path) -> None:
+        multithreading.ReturnOrErrorThread.__init__(self)
+        self.path = path
+
+    def run_target(self) -> nd.DVector:
+        """Loads the DVector at self.path"""
+        return nd.DVector.load(self.path)
+
+
 def read_tripends(
     base_year: int, forecast_years: list[int], tripend_path: Path
 ) -> tempro_trip_ends.TEMProTripEnds:
@@ -32,6 +44,7 @@ def read_tripends(
         tempro_trip_ends.TEMProTripEnds: the same trip-ends read in
     """
     LOG.info("Reading trip ends from %s", tripend_path)
+    tripend_path = Path(tripend_path)
 
     SEGMENTATION = {"hb": "hb_p_m", "nhb": "nhb_p_m"}
     dvectors = {
@@ -40,20 +53,23 @@ def read_tripends(
         "nhb_attractions": {},
         "nhb_productions": {},
     }
-    for i in ["hb", "nhb"]:
-        for j in ["productions", "attractions"]:
-            years = {}
-            key = f"{i}_{j}"
-            for year in [base_year] + forecast_years:
-                dvec = nd.DVector.load(
-                    os.path.join(
-                        tripend_path,
-                        key,
-                        f"{i}_msoa_notem_segmented_{year}_dvec.pkl",
-                    )
-                )
-                if i == "nhb":
-                    dvec = dvec.reduce(nd.get_segmentation_level("notem_nhb_output_reduced"))
-                years[year] = dvec.aggregate(nd.get_segmentation_level(SEGMENTATION[i]))
-            dvectors[key] = years
+    trip_ends = [(i, j) for i in ["hb", "nhb"] for j in ["productions", "attractions"]]
+    for year in [base_year] + forecast_years:
+        # Read all trip ends for a year together, one year at a time
+        # so only a few of the full DVectors are in memory at once
+        threads = []
+        for i, j in trip_ends:
+            thread = _LoadDVectorThread(
+                tripend_path / f"{i}_{j}" / f"{i}_msoa_notem_segmented_{year}_dvec.pkl"
+            )
+            thread.start()
+            threads.append(thread)
+        loaded = multithreading.wait_for_thread_return_or_error(threads)
+
+        for (i, j), dvec in zip(trip_ends, loaded):
+            if i == "nhb":
+                dvec = dvec.reduce(nd.get_segmentation_level("notem_nhb_output_reduced"))
+            dvectors[f"{i}_{j}"][year] = dvec.aggregate(
+                nd.get_segmentation_level(SEGMENTATION[i])
+            )
     return tempro_trip_ends.TEMProTripEnds(**dvectors)
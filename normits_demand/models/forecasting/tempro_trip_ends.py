@@ -200,12 +200,15 @@ class TEMProData:
             If an incorrect value is given for `segmentation`
             or `pa` parameters.
         """
+        # `data` returns a copy so only get it once
+        data = self.data
+
         # Create boolean mask for hb/nhb purposes
         seg = seg.lower()
         if seg == "hb":
-            purp_mask = self.data["purpose"] <= 8
+            purp_mask = data["purpose"] <= 8
         elif seg == "nhb":
-            purp_mask = self.data["purpose"] > 8
+            purp_mask = data["purpose"] > 8
         else:
             raise NTEMForecastError(
                 "segmentation should be one of " f"{self.SEGMENTATION.values()} not {seg!r}"
@@ -214,12 +217,12 @@ class TEMProData:
         pa_options = ["attractions", "productions"]
         if pa not in pa_options:
             raise NTEMForecastError(f"pa should be one of {pa_options} not {pa!r}")
-        pa_mask = self.data["trip_end_type"] == pa
+        pa_mask = data["trip_end_type"] == pa
 
         cols = ["msoa_zone_id", *self.SEGMENTATION_COLUMNS.values(), str(year)]
         return nd_core.DVector(
             nd_core.get_segmentation_level(self.SEGMENTATION[seg]),
-            self.data.loc[purp_mask & pa_mask, cols],
+            data.loc[purp_mask & pa_mask, cols],
             nd_core.get_zoning_system(self.ZONE_SYSTEM),
             time_format=self.TIME_FORMAT,
             zone_col=cols[0],
@@ -239,25 +242,18 @@ class TEMProData:
             LOG.debug("Producing TEMPro DVectors for %s", self._years)
             start = timing.current_milli_time()
             # Produce DVectors for all segments
-            hb_attr = {}
-            hb_prod = {}
-            nhb_attr = {}
-            nhb_prod = {}
+            trip_ends = [
+                (seg, pa) for seg in ("hb", "nhb") for pa in ("attractions", "productions")
+            ]
+            dvectors = {f"{seg}_{pa}": {} for seg, pa in trip_ends}
             for yr in self._years:
-                hb_attr[yr] = self._segment_dvector("hb", "attractions", yr)
-                hb_prod[yr] = self._segment_dvector("hb", "productions", yr)
-                nhb_attr[yr] = self._segment_dvector("nhb", "attractions", yr)
-                nhb_prod[yr] = self._segment_dvector("nhb", "productions", yr)
+                for seg, pa in trip_ends:
+                    dvectors[f"{seg}_{pa}"][yr] = self._segment_dvector(seg, pa, yr)
             LOG.debug(
                 "Done in %s",
                 timing.time_taken(start, timing.current_milli_time()),
             )
-            self._dvectors = {
-                "hb_attractions": hb_attr,
-                "hb_productions": hb_prod,
-                "nhb_attractions": nhb_attr,
-                "nhb_productions": nhb_prod,
-            }
+            self._dvectors = dvectors
         return TEMProTripEnds(**self._dvectors)
 
     def get(
@@ -13,6 +13,7 @@ import pandas as pd
 import numpy as np
 
 # Local imports
+from normits_demand.concurrency import multithreading
 from normits_demand.matrices.cube_mat_converter import CUBEMatConverter
 from normits_demand.utils import file_ops
 from normits_demand.matrices import omx_file
@@ -80,23 +81,28 @@ def stnzone_2_stn_tlc(
     file_ops.check_file_exists(stn_zone_to_node)
     file_ops.check_file_exists(rail_nodes)
     file_ops.check_file_exists(ext_nodes)
-    # read dataframes
-    stn_zone_to_node = file_ops.read_df(stn_zone_to_node)
-    rail_nodes = file_ops.read_df(rail_nodes)
-    ext_nodes = file_ops.read_df(
-        ext_nodes,
-        names=[
-            "N",
-            "X",
-            "Y",
-            "STATIONCODE",
-            "STATIONNAME",
-            "ZONEID",
-            "TFN_FLAG",
-            "Category_ID",
-        ],
-        usecols=[0, 1, 2, 3, 4, 5, 6, 7],
-        header=None,
+    # read dataframes, on threads as reading is IO bound
+    threads = [
+        file_ops.read_df_threaded(stn_zone_to_node),
+        file_ops.read_df_threaded(rail_nodes),
+        file_ops.read_df_threaded(
+            ext_nodes,
+            names=[
+                "N",
+                "X",
+                "Y",
+                "STATIONCODE",
+                "STATIONNAME",
+                "ZONEID",
+                "TFN_FLAG",
+                "Category_ID",
+            ],
+            usecols=[0, 1, 2, 3, 4, 5, 6, 7],
+            header=None,
+        ),
+    ]
+    stn_zone_to_node, rail_nodes, ext_nodes = multithreading.wait_for_thread_return_or_error(
+        threads
     )
 
     # concat all rail nodes
@@ -131,6 +137,7 @@ def export_mat_2_csv_via_omx(
     out_path: pathlib.Path,
     out_csv: str,
     segment: str,
+    out_suffix: str = ".csv",
 ) -> None:
     """Export Cube .MAT to .csv through .OMX.
 
@@ -146,6 +153,9 @@ def export_mat_2_csv_via_omx(
         name of the output file name
     segment: str
         segment of the overarching loop (e.g. purposes, periods, etc.)
+    out_suffix: str, default ".csv"
+        file type to export the matrices to, can be any type supported
+        by `file_ops.write_df` e.g. ".csv.bz2" for compressed CSVs
     """
     # Export PT Demand
     c_m = CUBEMatConverter(cube_exe)
@@ -158,7 +168,9 @@ def export_mat_2_csv_via_omx(
                 omx_mat.get_matrix_level(mx_lvl)
             )
             # export matrix to csv
-            file_ops.write_df(mat, f"{out_path}/{out_csv}_{mx_lvl}.csv", index=False)
+            file_ops.write_df(
+                mat, pathlib.Path(out_path, f"{out_csv}_{mx_lvl}{out_suffix}"), index=False
+            )
 
     # delete .omx file
     os.remove(f"{out_path}/{out_csv}.omx")
@@ -170,6 +182,7 @@ def pt_demand_from_to(
     cat_folder: pathlib.Path,
     run_folder: pathlib.Path,
     output_folder: pathlib.Path,
+    skip_if_current: bool = False,
 ) -> None:
     """Create PA From/To Home matrices.
 
@@ -183,6 +196,9 @@ def pt_demand_from_to(
         full path top the folder containing the .mat input files.
     output_folder : Path
         full path top the folder where outputs to be saved.
+    skip_if_current : bool, default False
+        if True, the CUBE run is skipped when all the output
+        matrices already exist and are newer than all the inputs.
     """
     # create file paths
     area_sectors = cat_folder / "Params/Demand/Sector_Areas_Zones.MAT"
@@ -223,6 +239,20 @@ def pt_demand_from_to(
     for file in file_list:
         file_ops.check_file_exists(file)
 
+    if skip_if_current:
+        out_mats = [output_folder / f"PT_{p}.MAT" for p in ("AM", "IP", "PM", "OP")]
+        # inputs are known to exist, so a missing file is always an output
+        try:
+            up_to_date = min(os.path.getmtime(path) for path in out_mats) > max(
+                os.path.getmtime(path) for path in file_list
+            )
+        except FileNotFoundError:
+            up_to_date = False
+
+        if up_to_date:
+            LOG.info("PT period matrices are up to date, skipping CUBE run")
+            return
+
     to_write = [
         "RUN PGM=MATRIX",
         f'FILEI MATI[1] = "{pt_24hr_demand}"',
@@ -93,9 +93,7 @@ class BaseConfig(pydantic.BaseModel):
             Instance of class with attributes filled in from
             the YAML data.
         """
-        with open(path, "rt") as file:
-            text = file.read()
-        return cls.from_yaml(text)
+        return cls.from_yaml(pathlib.Path(path).read_text())
 
     def to_yaml(self) -> str:
         """Convert attributes from self to YAML string.
@@ -123,8 +121,7 @@ class BaseConfig(pydantic.BaseModel):
         path : pathlib.Path
             Path to YAML file to output.
         """
-        with open(path, "wt") as file:
-            file.write(self.to_yaml())
+        pathlib.Path(path).write_text(self.to_yaml())
 
 
 ##### FUNCTIONS #####
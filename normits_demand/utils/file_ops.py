@@ -67,6 +67,27 @@ class WriteDfThread(multithreading.ReturnOrErrorThread):
         write_df(self.df, self.path, **self.kwargs)
 
 
+class ReadDfThread(multithreading.ReturnOrErrorThread):
+    """Simple Thread for reading a dataframe from disk using a thread"""
+
+    def __init__(self, path: nd.PathLike, **kwargs) -> None:
+        multithreading.ReturnOrErrorThread.__init__(self)
+        self.path = path
+        self.kwargs = kwargs
+
+    def run_target(self) -> pd.DataFrame:
+        """Reads the dataframe at self.path
+
+        Overrides parent to run this on thread start.
+
+        Returns
+        -------
+        df:
+            The read in df at self.path.
+        """
+        return read_df(self.path, **self.kwargs)
+
+
 def remove_suffixes(path: pathlib.Path) -> pathlib.Path:
     """Removes all suffixes from path
 
@@ -317,6 +338,13 @@ def read_df(
     -------
     df:
         The read in df at path.
+
+    Raises
+    ------
+    FileNotFoundError:
+        If the file at path doesn't exist, and no similar file is found
+        when `find_similar` is True. There's no need to call
+        `check_file_exists()` before reading.
     """
 
     # Try and find similar files if we are allowed
@@ -419,6 +447,29 @@ def write_df_threaded(*args, **kwargs) -> WriteDfThread:
     return thread
 
 
+def read_df_threaded(*args, **kwargs) -> ReadDfThread:
+    """
+    Reads in the dataframe at path on a separate thread.
+
+    Parameters
+    ----------
+    path:
+        The full path to the dataframe to read in
+
+    **kwargs:
+        Any arguments to pass to `read_df()`.
+
+    Returns
+    -------
+    thread:
+        The started thread reading in the dataframe, the df can be
+        retrieved with `multithreading.wait_for_thread_return_or_error()`.
+    """
+    thread = ReadDfThread(*args, **kwargs)
+    thread.start()
+    return thread
+
+
 def filename_in_list(
     filename: nd.PathLike,
     lst: List[nd.PathLike],
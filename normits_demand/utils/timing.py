@@ -19,7 +19,8 @@ from datetime import datetime
 
 
 def current_milli_time() -> float:
-    return time.perf_counter() * 1000
+    # Integer nanosecond counter avoids float rounding on long uptimes
+    return time.perf_counter_ns() / 1_000_000
 
 
 def get_time() -> str:
@@ -11,9 +11,13 @@ File purpose:
 
 """
 # Built-Ins
+import weakref
 import warnings
+import importlib.util
 
 from typing import Any
+from typing import Callable
+from typing import Dict
 from typing import List
 from typing import Tuple
 from typing import Union
@@ -22,6 +26,8 @@ from typing import Union
 import numpy as np
 import pandas as pd
 
+from scipy import sparse
+
 # Local Imports
 import normits_demand as nd
 
@@ -30,21 +36,19 @@ from normits_demand.utils import math_utils
 from normits_demand.utils import pandas_utils as pd_utils
 from normits_demand.concurrency import multiprocessing
 
+# Matrices at least this big are translated on the GPU when backend='auto'
+CUPY_AUTO_MIN_BYTES = 2 ** 28
+
+# Arrays derived from translations, keyed on (id(translation), derivation)
+_TRANSLATION_CACHE: Dict[Tuple[int, str], Any] = dict()
+
 
 def _lower_memory_row_translation(vector_chunk: np.array,
                                   row_translation: np.array,
                                   ) -> np.array:
     """Internal MP functionality of _lower_memory_matrix_zone_translation()"""
-    # Translate the rows
-    row_translated = list()
-    for vector in np.hsplit(vector_chunk, vector_chunk.shape[1]):
-        vector = vector.flatten()
-        vector = np.broadcast_to(np.expand_dims(vector, axis=1), row_translation.shape)
-        vector = vector * row_translation
-        vector = vector.sum(axis=0)
-        row_translated.append(vector)
-
-    return row_translated
+    # Translate the rows. Each column of vector_chunk becomes a row
+    return np.matmul(vector_chunk.T, row_translation)
 
 
 def _lower_memory_col_translation(vector_chunk: np.array,
@@ -52,15 +56,7 @@ def _lower_memory_col_translation(vector_chunk: np.array,
                                   ) -> np.array:
     """Internal MP functionality of _lower_memory_matrix_zone_translation()"""
     # Translate the columns
-    col_translated = list()
-    for vector in np.vsplit(vector_chunk, vector_chunk.shape[0]):
-        vector = vector.flatten()
-        vector = np.broadcast_to(np.expand_dims(vector, axis=1), col_translation.shape)
-        vector = vector * col_translation
-        vector = vector.sum(axis=0)
-        col_translated.append(vector)
-
-    return col_translated
+    return np.matmul(vector_chunk, col_translation)
 
 
 def _lower_memory_matrix_zone_translation(matrix: np.array,
@@ -70,8 +66,7 @@ def _lower_memory_matrix_zone_translation(matrix: np.array,
                                           ) -> np.array:
     # Translate the rows
     kwargs = list()
-    n_splits = matrix.shape[1] / chunk_size
-    n_splits = 1 if n_splits <= 0 else n_splits
+    n_splits = max(matrix.shape[1] // chunk_size, 1)
     for vector_chunk in np.array_split(matrix, n_splits, axis=1):
         kwargs.append({
             'vector_chunk': vector_chunk,
@@ -89,8 +84,7 @@ def _lower_memory_matrix_zone_translation(matrix: np.array,
 
     # Translate the rows
     kwargs = list()
-    n_splits = row_translated.shape[0] / chunk_size
-    n_splits = 1 if n_splits <= 0 else n_splits
+    n_splits = max(row_translated.shape[0] // chunk_size, 1)
     for vector_chunk in np.array_split(row_translated, n_splits, axis=0):
         kwargs.append({
             'vector_chunk': vector_chunk,
@@ -107,6 +101,231 @@ def _lower_memory_matrix_zone_translation(matrix: np.array,
     return np.vstack(full_translated)
 
 
+def _cached_translation(translation: np.ndarray,
+                        name: str,
+                        build_fn: Callable[[np.ndarray], Any],
+                        ) -> Any:
+    """Returns build_fn(translation), caching the result for repeat calls
+
+    The same translation is often used to translate many matrices. Results
+    are kept until translation is garbage collected, so translations
+    must not be modified in place between calls.
+    """
+    key = (id(translation), name)
+    cached = _TRANSLATION_CACHE.get(key)
+    if cached is None:
+        cached = build_fn(translation)
+        _TRANSLATION_CACHE[key] = cached
+        weakref.finalize(translation, _TRANSLATION_CACHE.pop, key, None)
+
+    return cached
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Flags array as read-only and returns it"""
+    array.flags.writeable = False
+    return array
+
+
+def _cast_translation(translation: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """Casts translation to dtype, caching the result for repeat calls"""
+    dtype = np.dtype(dtype)
+    if translation.dtype == dtype:
+        return translation
+
+    return _cached_translation(
+        translation=translation,
+        name=dtype.str,
+        build_fn=lambda x: _read_only(x.astype(dtype)),
+    )
+
+
+def _transposed_translation(translation: np.ndarray) -> np.ndarray:
+    """Returns a C-contiguous copy of translation.T, cached for repeat calls"""
+    if translation.T.flags.c_contiguous:
+        return translation.T
+
+    return _cached_translation(
+        translation=translation,
+        name='T',
+        build_fn=lambda x: _read_only(np.ascontiguousarray(x.T)),
+    )
+
+
+def _translation_density(translation: np.ndarray) -> float:
+    """Returns the fraction of non-zero factors, cached for repeat calls"""
+    return _cached_translation(
+        translation=translation,
+        name='density',
+        build_fn=lambda x: np.count_nonzero(x) / x.size,
+    )
+
+
+def _sparse_transposed_translation(translation: np.ndarray) -> sparse.csr_matrix:
+    """Returns a sparse copy of translation.T, cached for repeat calls"""
+    return _cached_translation(
+        translation=translation,
+        name='sparse_T',
+        build_fn=lambda x: sparse.csr_matrix(_transposed_translation(x)),
+    )
+
+
+def _sparse_matrix_zone_translation(matrix: np.ndarray,
+                                    row_translation: np.ndarray,
+                                    col_translation: np.ndarray,
+                                    out_order: str = 'C',
+                                    ) -> np.ndarray:
+    """Internal sparse functionality of numpy_matrix_zone_translation()
+
+    Only the non-zero translation factors are multiplied through, which is
+    much faster than the dense matrix multiplications when each zone only
+    translates into a few others.
+    """
+    row_translation_t = _sparse_transposed_translation(row_translation)
+    col_translation_t = _sparse_transposed_translation(col_translation)
+
+    # (row.T @ matrix @ col) == (col.T @ (row.T @ matrix).T).T
+    rows_done = row_translation_t @ matrix
+    translated_matrix = (col_translation_t @ rows_done.T).T
+    return np.asarray(translated_matrix, order=out_order)
+
+
+def _cupy_matrix_zone_translation(matrix: np.ndarray,
+                                  row_translation: np.ndarray,
+                                  col_translation: np.ndarray,
+                                  out_order: str = 'C',
+                                  ) -> np.ndarray:
+    """Internal GPU functionality of numpy_matrix_zone_translation()
+
+    The translations are copied onto the device once and cached, so only
+    matrix needs to be transferred on repeat calls.
+    """
+    import cupy  # pylint: disable=import-outside-toplevel
+
+    row_translation_t = _cached_translation(
+        translation=row_translation,
+        name='cupy_T',
+        build_fn=lambda x: cupy.asarray(_transposed_translation(x)),
+    )
+    col_translation = _cached_translation(
+        translation=col_translation,
+        name='cupy',
+        build_fn=cupy.asarray,
+    )
+
+    translated_matrix = row_translation_t @ cupy.asarray(matrix) @ col_translation
+    return np.asarray(cupy.asnumpy(translated_matrix), order=out_order)
+
+
+def _float64_total(array: np.ndarray) -> float:
+    """Sums all the values in array, accumulating in float64
+
+    Ravels in memory order so no copy is made for non C-contiguous arrays.
+    """
+    return np.add.reduce(array.ravel(order='K'), dtype=np.float64)
+
+
+def _total_rel_tol(dtype: np.dtype, rel_tol: float = 0.0001) -> float:
+    """Relaxes rel_tol for dtypes which can't hold that much precision"""
+    return max(rel_tol, 10 * float(np.finfo(dtype).eps))
+
+
+def _check_dtype_range(array: np.ndarray,
+                       translation_dtype: np.dtype,
+                       name: str = 'matrix',
+                       ) -> None:
+    """Raises a ValueError if array holds values translation_dtype can't
+
+    translation_dtype must be a floating point dtype, otherwise the
+    fractional translation factors would be truncated.
+    """
+    if not np.issubdtype(translation_dtype, np.floating):
+        raise ValueError(
+            "translation_dtype must be a floating point dtype, otherwise the "
+            "translation factors are truncated. Got %s for %s, set "
+            "translation_dtype or convert %s to floats."
+            % (np.dtype(translation_dtype), name, name)
+        )
+
+    # No need to scan the values if every value is guaranteed to fit
+    if np.can_cast(array.dtype, translation_dtype, casting='safe'):
+        return
+
+    arr_max = np.max(array)
+    arr_min = np.min(array)
+    dtype_max = np.finfo(translation_dtype).max
+    dtype_min = np.finfo(translation_dtype).min
+
+    if arr_max > dtype_max:
+        raise ValueError(
+            "Maximum value in %s is greater than the given "
+            "translation_dtype can handle.\n"
+            "Maximum dtype value: %s\n"
+            "Maximum %s value: %s"
+            % (name, dtype_max, name, arr_max)
+        )
+
+    if arr_min < dtype_min:
+        raise ValueError(
+            "Minimum value in %s is less than the given "
+            "translation_dtype can handle.\n"
+            "Minimum dtype value: %s\n"
+            "Minimum %s value: %s"
+            % (name, dtype_min, name, arr_min)
+        )
+
+
+def _reindex_square_matrix(matrix: pd.DataFrame,
+                           unique_zones: List[Any],
+                           infill: float = 0.0,
+                           sorter: np.ndarray = None,
+                           ) -> np.ndarray:
+    """Reindexes a square matrix to unique_zones, returning a numpy array
+
+    Equivalent to `matrix.reindex(index=unique_zones, columns=unique_zones,
+    fill_value=infill).values`, but zone positions are found with a
+    binary search over the sorted zones rather than a full pandas alignment.
+    Any zones in matrix that are not in unique_zones are dropped.
+    If given, sorter should be the result of `np.argsort(unique_zones)`.
+    Raises a ValueError if the matrix index or columns contain duplicates.
+    """
+    # Scattering duplicates would silently keep only the last one
+    if not matrix.index.is_unique or not matrix.columns.is_unique:
+        raise ValueError(
+            "Cannot reindex a matrix with duplicate zones in its index or columns.\n"
+            "Duplicate index zones: %s\n"
+            "Duplicate column zones: %s"
+            % (
+                matrix.index[matrix.index.duplicated()].unique().tolist(),
+                matrix.columns[matrix.columns.duplicated()].unique().tolist(),
+            )
+        )
+
+    zones = np.asarray(unique_zones)
+    if sorter is None:
+        sorter = np.argsort(zones, kind="stable")
+    sorted_zones = zones[sorter]
+
+    def get_positions(labels: pd.Index) -> Tuple[np.ndarray, np.ndarray]:
+        labels = labels.to_numpy()
+        pos = np.searchsorted(sorted_zones, labels)
+        pos = np.clip(pos, 0, len(sorted_zones) - 1)
+        mask = sorted_zones[pos] == labels
+        return sorter[pos[mask]], mask
+
+    row_pos, row_mask = get_positions(matrix.index)
+    col_pos, col_mask = get_positions(matrix.columns)
+
+    values = matrix.to_numpy()
+    # Like pandas, only promote the dtype when some zones need infilling
+    dtype = values.dtype
+    if len(row_pos) < len(zones) or len(col_pos) < len(zones):
+        dtype = np.result_type(dtype, np.min_scalar_type(infill))
+    out = np.full((len(zones), len(zones)), infill, dtype=dtype)
+    out[np.ix_(row_pos, col_pos)] = values[np.ix_(row_mask, col_mask)]
+    return out
+
+
 def numpy_matrix_zone_translation(matrix: np.array,
                                   translation: np.array = None,
                                   row_translation: np.array = None,
@@ -115,6 +334,9 @@ def numpy_matrix_zone_translation(matrix: np.array,
                                   check_shapes: bool = True,
                                   check_totals: bool = False,
                                   chunk_size: int = 100,
+                                  out_order: str = 'C',
+                                  sparse_threshold: float = 0.1,
+                                  backend: str = 'numpy',
                                   ) -> np.array:
     """Translates matrix with translation
 
@@ -148,8 +370,8 @@ def numpy_matrix_zone_translation(matrix: np.array,
 
     translation_dtype:
         The numpy datatype to use to do the translation. If None, then the
-        dtype of the matrix is used. As this is a 3d translation, it can
-        use a lot of memory if float64 is used. Where such high precision
+        dtype of the matrix is used. Large translations can use a lot of
+        memory if float64 is used. Where such high precision
         isn't needed, a more memory efficient dtype can be passed in instead
         and the translation will be carried out in it.
 
@@ -169,6 +391,25 @@ def numpy_matrix_zone_translation(matrix: np.array,
         3D translation. Most of the time this can be ignored unless
         translating between two massive zoning systems.
 
+    out_order:
+        The memory layout of the returned matrix. Either 'C' (row-major)
+        or 'F' (column-major). Choose the layout that matches how the
+        returned matrix will be consumed, e.g. 'F' if it is mostly going to
+        be reduced along axis 0.
+
+    sparse_threshold:
+        If the fraction of non-zero factors in both row_translation and
+        col_translation is less than this, the translation is done with
+        sparse matrices. Most zone translations are very sparse, as each
+        zone only splits into a few others. Only used for float32 and
+        float64 translations. Set to 0 to always use dense matrices.
+
+    backend:
+        Where to do the translation. One of 'numpy', 'cupy', or 'auto'.
+        'cupy' translates on the GPU and needs the optional cupy package
+        installed. 'auto' uses 'cupy' when it is installed and matrix is at
+        least CUPY_AUTO_MIN_BYTES in size, otherwise 'numpy'.
+
     Returns
     -------
     translated_matrix:
@@ -179,10 +420,20 @@ def numpy_matrix_zone_translation(matrix: np.array,
     ValueError:
         Will raise an error if matrix is not a square array, or if translation
         does not have the same number of rows as matrix.
+
+    Notes
+    -----
+    Arrays derived from the translations (dtype casts, transposed and
+    sparse copies) are cached against the translation objects, so the
+    same translations can be reused cheaply across many matrices. The
+    cache is keyed on the object, not its values, so translations must
+    not be modified in place between calls, otherwise the stale cached
+    arrays are used without any error. Pass a new array instead, the
+    cached arrays are released when a translation is garbage collected.
     """
     if translation is not None:
-        row_translation = translation.copy()
-        col_translation = translation.copy()
+        row_translation = translation
+        col_translation = translation
 
     if row_translation is None or col_translation is None:
         raise ValueError(
@@ -191,6 +442,23 @@ def numpy_matrix_zone_translation(matrix: np.array,
             "col_translations needs to be set."
         )
 
+    if out_order not in ('C', 'F'):
+        raise ValueError(
+            "out_order must be one of 'C' or 'F'. Got %s"
+            % out_order
+        )
+
+    if backend not in ('numpy', 'cupy', 'auto'):
+        raise ValueError(
+            "backend must be one of 'numpy', 'cupy' or 'auto'. Got %s"
+            % backend
+        )
+
+    if backend == 'auto':
+        cupy_installed = importlib.util.find_spec('cupy') is not None
+        use_gpu = cupy_installed and matrix.nbytes >= CUPY_AUTO_MIN_BYTES
+        backend = 'cupy' if use_gpu else 'numpy'
+
     # ## OPTIONALLY CHECK INPUT SHAPES ## #
     if check_shapes:
         # Check matrix is square
@@ -232,59 +500,49 @@ def numpy_matrix_zone_translation(matrix: np.array,
         translation_dtype = matrix.dtype
 
     # Make sure we're not gonna introduce infs...
-    mat_max = np.max(matrix)
-    mat_min = np.min(matrix)
-    dtype_max = np.finfo(translation_dtype).max
-    dtype_min = np.finfo(translation_dtype).min
-
-    if mat_max > dtype_max:
-        raise ValueError(
-            "Maximum value in matrix is greater than the given "
-            "translation_dtype can handle.\n"
-            "Maximum dtype value: %s\n"
-            "Maximum matrix value: %s"
-            % (dtype_max, mat_max)
-        )
-
-    if mat_min < dtype_min:
-        raise ValueError(
-            "Minimum value in matrix is less than the given "
-            "translation_dtype can handle.\n"
-            "Minimum dtype value: %s\n"
-            "Minimum matrix value: %s"
-            % (dtype_min, mat_min)
-        )
+    _check_dtype_range(matrix, translation_dtype, name="matrix")
 
     # Now we know it's safe. Translate
-    matrix = matrix.astype(translation_dtype)
-    row_translation = row_translation.astype(translation_dtype)
-    col_translation = col_translation.astype(translation_dtype)
+    matrix = matrix.astype(translation_dtype, copy=False)
+    row_translation = _cast_translation(row_translation, translation_dtype)
+    col_translation = _cast_translation(col_translation, translation_dtype)
 
     # ## DO THE TRANSLATION ## #
     # Get the input and output shapes
     n_in, n_out = row_translation.shape
 
+    # Most translations are very sparse, only multiply the non-zero factors
+    use_sparse = False
+    if backend == 'numpy' and sparse_threshold > 0 and matrix.dtype in (np.float32, np.float64):
+        row_density = _translation_density(row_translation)
+        col_density = _translation_density(col_translation)
+        use_sparse = max(row_density, col_density) < sparse_threshold
+
     # We might run out of memory doing it this way...
     not_enough_memory = False
 
-    try:
-        # Translate rows
-        mult_shape = (n_in, n_in, n_out)
-        a = np.broadcast_to(np.expand_dims(matrix, axis=2), mult_shape)
-        trans_a = np.broadcast_to(np.expand_dims(row_translation, axis=1), mult_shape)
-        temp = a * trans_a
-
-        # mat is transposed, but we need it this way
-        rows_done = temp.sum(axis=0)
-
-        # Translate cols
-        mult_shape = (n_in, n_out, n_out)
-        b = np.broadcast_to(np.expand_dims(rows_done, axis=2), mult_shape)
-        trans_b = np.broadcast_to(np.expand_dims(col_translation, axis=1), mult_shape)
-        temp = b * trans_b
-        translated_matrix = temp.sum(axis=0)
-    except MemoryError:
-        not_enough_memory = True
+    if backend == 'cupy':
+        translated_matrix = _cupy_matrix_zone_translation(
+            matrix=matrix,
+            row_translation=row_translation,
+            col_translation=col_translation,
+            out_order=out_order,
+        )
+    elif use_sparse:
+        translated_matrix = _sparse_matrix_zone_translation(
+            matrix=matrix,
+            row_translation=row_translation,
+            col_translation=col_translation,
+            out_order=out_order,
+        )
+    else:
+        try:
+            # Translate rows, then cols. Two matrix multiplications
+            rows_done = np.matmul(_transposed_translation(row_translation), matrix)
+            translated_matrix = np.empty((n_out, n_out), dtype=translation_dtype, order=out_order)
+            np.matmul(rows_done, col_translation, out=translated_matrix)
+        except MemoryError:
+            not_enough_memory = True
 
     # Try translation again, a slower way.
     if not_enough_memory:
@@ -294,23 +552,182 @@ def numpy_matrix_zone_translation(matrix: np.array,
             col_translation=col_translation,
             chunk_size=chunk_size,
         )
+        translated_matrix = np.asarray(translated_matrix, order=out_order)
 
     if not check_totals:
         return translated_matrix
 
-    if not math_utils.is_almost_equal(matrix.sum(), translated_matrix.sum()):
+    before = _float64_total(matrix)
+    after = _float64_total(translated_matrix)
+    rel_tol = _total_rel_tol(translation_dtype)
+    if not math_utils.is_almost_equal(before, after, rel_tol=rel_tol):
         raise ValueError(
             "Some values seem to have been dropped during the translation. "
             "Check the given translation matrix isn't unintentionally dropping "
             "values. If the difference is small, it's likely a rounding error.\n"
             "Before: %s\n"
             "After: %s"
-            % (matrix.sum(), translated_matrix.sum())
+            % (before, after)
         )
 
     return translated_matrix
 
 
+def numpy_matrix_zone_translation_batch(matrices: np.ndarray,
+                                        translation: np.ndarray = None,
+                                        row_translation: np.ndarray = None,
+                                        col_translation: np.ndarray = None,
+                                        translation_dtype: np.dtype = None,
+                                        check_shapes: bool = True,
+                                        check_totals: bool = False,
+                                        ) -> np.ndarray:
+    """Translates a stack of matrices which all share the same translation
+
+    Equivalent to calling `numpy_matrix_zone_translation()` on each matrix
+    in matrices, but all the checks are only done once and the translations
+    are carried out as batched matrix multiplications.
+
+    Parameters
+    ----------
+    matrices:
+        The matrices to translate. Each matrix needs to be square!
+        e.g. (n_matrices, n_in, n_in)
+
+    translation:
+        The matrix defining the factors to use to translate the rows and the
+        columns of each matrix. Setting this argument would be the same as
+        setting row_translation and col_translation to the same matrix. If
+        defined, row_translation and col_translation will be ignored.
+        Should be of shape (n_in, n_out), where the output
+        matrices shape will be (n_matrices, n_out, n_out).
+
+    row_translation:
+        The matrix defining the factors to use to translate the rows of
+        each matrix. If defined, then col_translation needs to be defined too.
+        Should be of shape (n_in, n_out).
+
+    col_translation:
+        The matrix defining the factors to use to translate the columns of
+        each matrix. If defined, then row_translation needs to be defined too.
+        Should be of shape (n_in, n_out).
+
+    translation_dtype:
+        The numpy datatype to use to do the translation. If None, then the
+        dtype of matrices is used.
+
+    check_shapes:
+        Whether to check that the input and translation shapes look correct.
+        Will raise an error if matrices is not a stack of square arrays, or
+        if translation does not have the same number of rows as each matrix.
+        Optionally set to False if checks have been done externally to speed
+        up runtime.
+
+    check_totals:
+        Whether to check that each input and output matrix sum to the same
+        total.
+
+    Returns
+    -------
+    translated_matrices:
+        matrices, translated into (n_matrices, n_out, n_out) shape via
+        translation.
+
+    Raises
+    ------
+    ValueError:
+        Will raise an error if matrices is not a stack of square arrays, or
+        if translation does not have the same number of rows as each matrix.
+
+    See Also
+    --------
+    `numpy_matrix_zone_translation()`
+    """
+    if translation is not None:
+        row_translation = translation
+        col_translation = translation
+
+    if row_translation is None or col_translation is None:
+        raise ValueError(
+            "No translations have been given. Don't know how to translate. "
+            "Either translation needs to be set, or row_translation AND "
+            "col_translations needs to be set."
+        )
+
+    # ## OPTIONALLY CHECK INPUT SHAPES ## #
+    if check_shapes:
+        # Check matrices is a stack of square matrices
+        if matrices.ndim != 3 or matrices.shape[1] != matrices.shape[2]:
+            raise ValueError(
+                "The given matrices are not a stack of square matrices. "
+                "Expected a (n_matrices, n_in, n_in) shape array for the "
+                "numpy zone translations to work.\n"
+                "Given matrices shape: %s"
+                % str(matrices.shape)
+            )
+
+        # Check translations are the same shape
+        if row_translation.shape != col_translation.shape:
+            raise ValueError(
+                "Row and column translations are not the same shape. "
+                "Both need to be (n_in, n_out) shape for "
+                "numpy zone translations to work.\n"
+                "Row shape: %s\n"
+                "Column shape: %s"
+                % (row_translation.shape, col_translation.shape)
+            )
+
+        # Check translation has the right number of rows
+        n_zones_in, _ = row_translation.shape
+        if n_zones_in != matrices.shape[1]:
+            raise ValueError(
+                "The given translation does not have the correct number of "
+                "rows. Translation rows needs to match matrix rows for the "
+                "numpy zone translations to work.\n"
+                "Given matrices shape: %s\n"
+                "Given translation shape: %s"
+                % (matrices.shape, row_translation.shape)
+            )
+
+    # ## CONVERT DTYPES ## #
+    if translation_dtype is None:
+        translation_dtype = matrices.dtype
+
+    # Make sure we're not gonna introduce infs...
+    _check_dtype_range(matrices, translation_dtype, name="matrices")
+
+    # Now we know it's safe. Translate
+    matrices = matrices.astype(translation_dtype, copy=False)
+    row_translation = _cast_translation(row_translation, translation_dtype)
+    col_translation = _cast_translation(col_translation, translation_dtype)
+
+    # ## TRANSLATE ## #
+    # Broadcasts over the first axis of matrices
+    translated = np.matmul(
+        np.matmul(_transposed_translation(row_translation), matrices),
+        col_translation,
+    )
+
+    if not check_totals:
+        return translated
+
+    before = np.add.reduce(matrices.reshape(len(matrices), -1), axis=1, dtype=np.float64)
+    after = np.add.reduce(translated.reshape(len(translated), -1), axis=1, dtype=np.float64)
+    rel_tol = _total_rel_tol(translation_dtype)
+    for i, (mat_before, mat_after) in enumerate(zip(before, after)):
+        if not math_utils.is_almost_equal(mat_before, mat_after, rel_tol=rel_tol):
+            raise ValueError(
+                "Some values seem to have been dropped during the translation "
+                "of matrix %s. Check the given translation matrix isn't "
+                "unintentionally dropping values. If the difference is small, "
+                "it's likely a rounding error.\n"
+                "Before: %s\n"
+                "After: %s"
+                % (i, mat_before, mat_after)
+            )
+
+    return translated
+
+
 def numpy_vector_zone_translation(vector: np.array,
                                   translation: np.array,
                                   translation_dtype: np.dtype = None,
@@ -334,8 +751,8 @@ def numpy_vector_zone_translation(vector: np.array,
 
     translation_dtype:
         The numpy datatype to use to do the translation. If None, then the
-        dtype of the vector is used. As this is a 2d translation, it can
-        use a lot of memory if float64 is used. Where such high precision
+        dtype of the vector is used. Large translations can use a lot of
+        memory if float64 is used. Where such high precision
         isn't needed, a more memory efficient dtype can be passed in instead
         and the translation will be carried out in it.
 
@@ -392,54 +809,381 @@ def numpy_vector_zone_translation(vector: np.array,
         translation_dtype = vector.dtype
 
     # Make sure we're not gonna introduce infs...
-    mat_max = np.max(vector)
-    mat_min = np.min(vector)
-    dtype_max = np.finfo(translation_dtype).max
-    dtype_min = np.finfo(translation_dtype).min
-
-    if mat_max > dtype_max:
-        raise ValueError(
-            "Maximum value in vector is greater than the given "
-            "translation_dtype can handle.\n"
-            "Maximum dtype value: %s\n"
-            "Maximum vector value: %s"
-            % (dtype_max, mat_max)
-        )
-
-    if mat_min < dtype_min:
-        raise ValueError(
-            "Minimum value in vector is less than the given "
-            "translation_dtype can handle.\n"
-            "Minimum dtype value: %s\n"
-            "Minimum vector value: %s"
-            % (dtype_min, mat_min)
-        )
+    _check_dtype_range(vector, translation_dtype, name="vector")
 
     # Now we know it's safe. Translate
-    vector = vector.astype(translation_dtype)
-    translation = translation.astype(translation_dtype)
+    vector = vector.astype(translation_dtype, copy=False)
+    translation = _cast_translation(translation, translation_dtype)
 
     # ## TRANSLATE ## #
-    out_vector = np.broadcast_to(np.expand_dims(vector, axis=1), translation.shape)
-    out_vector = out_vector * translation
-    out_vector = out_vector.sum(axis=0)
+    out_vector = np.matmul(vector, translation)
 
     if not check_totals:
         return out_vector
 
-    if not math_utils.is_almost_equal(vector.sum(), out_vector.sum()):
+    before = _float64_total(vector)
+    after = _float64_total(out_vector)
+    rel_tol = _total_rel_tol(translation_dtype)
+    if not math_utils.is_almost_equal(before, after, rel_tol=rel_tol):
         raise ValueError(
             "Some values seem to have been dropped during the translation. "
             "Check the given translation matrix isn't unintentionally dropping "
             "values. If the difference is small, it's likely a rounding error.\n"
             "Before: %s\n"
             "After: %s"
-            % (vector.sum(), out_vector.sum())
+            % (before, after)
         )
 
     return out_vector
 
 
+class ZoneTranslator:
+    """Translates pandas matrices from one zoning system to another
+
+    All the setup needed to translate a matrix is done once, on
+    construction. This includes validating the translation and squaring
+    it into a numpy array. Each call to `ZoneTranslator.translate()` then
+    only needs to align the matrix with the from zones and do the
+    arithmetic. Build one of these and reuse it when translating many
+    matrices with the same translation.
+
+    Attributes
+    ----------
+    from_unique_zones:
+        A numpy array of all the unique zones in the from_zone system.
+
+    to_unique_zones:
+        A numpy array of all the unique zones in the to_zone system.
+
+    row_translation:
+        A numpy array of shape (n_from_zones, n_to_zones) defining the
+        factors to translate the rows of a matrix.
+
+    col_translation:
+        A numpy array of shape (n_from_zones, n_to_zones) defining the
+        factors to translate the columns of a matrix.
+    """
+
+    def __init__(self,
+                 from_zone_col: str,
+                 to_zone_col: str,
+                 factors_col: str,
+                 from_unique_zones: List[Any],
+                 to_unique_zones: List[Any],
+                 translation: pd.DataFrame = None,
+                 row_translation: pd.DataFrame = None,
+                 col_translation: pd.DataFrame = None,
+                 translate_infill: float = 0.0,
+                 validate: bool = True,
+                 ):
+        """Builds and validates the translations
+
+        Parameters
+        ----------
+        from_zone_col:
+            The name of the column in translation containing the from_zone
+            system ID. Values should be in the same format as the index and
+            columns of the matrices to translate.
+
+        to_zone_col:
+            The name of the column in translation containing the to_zone
+            system ID. Values should be in the same format as expected in
+            the output.
+
+        factors_col:
+            The name of the column in translation containing the translation
+            factors between from_zone and to_zone. Where zone pairs do not
+            exist, they will be infilled with translate_infill.
+
+        from_unique_zones:
+            A list of all the unique zones in the from_zone system. Used to
+            know where an infill is needed for missing zones in translation.
+
+        to_unique_zones:
+            A list of all the unique zones in the to_zone system. Used to
+            know where an infill is needed for missing zones in translation.
+
+        translation:
+            A pandas dataframe with at least 3 columns, defining how the
+            factor to translate from from_zone to to_zone. Setting this
+            argument would be the same as setting row_translation and
+            col_translation to the same value. If defined, row_translation
+            and col_translation will be ignored.
+            Needs to contain columns [from_zone_col, to_zone_col, factors_col].
+
+        row_translation:
+            A pandas dataframe with at least 3 columns, defining how the
+            factor to translate from from_zone to to_zone for the rows of
+            a matrix. If defined, then col_translation needs to be defined too.
+            Needs to contain columns [from_zone_col, to_zone_col, factors_col].
+
+        col_translation:
+            A pandas dataframe with at least 3 columns, defining how the
+            factor to translate from from_zone to to_zone for the columns of
+            a matrix. If defined, then row_translation needs to be defined too.
+            Needs to contain columns [from_zone_col, to_zone_col, factors_col].
+
+        translate_infill:
+            The value to use to infill any missing translation factors.
+
+        validate:
+            Whether to check from_unique_zones and to_unique_zones for
+            duplicates, and warn about zones missing from the translations.
+            Optionally set to False if checks have been done externally to
+            speed up runtime.
+        """
+        # Init
+        if translation is not None:
+            row_translation = translation
+            col_translation = translation
+
+        if row_translation is None or col_translation is None:
+            raise ValueError(
+                "No translations have been given. Don't know how to translate. "
+                "Either translation needs to be set, or row_translation AND "
+                "col_translations needs to be set."
+            )
+
+        # ## CHECK ZONE NAME DTYPES ## #
+        if row_translation[from_zone_col].dtype != col_translation[from_zone_col].dtype:
+            raise ValueError(
+                "The datatype of from_zone_col must be the same in "
+                "row_translation and col_translation for the zone "
+                "translation to work.\n"
+                "row_translation[from_zone_col] Dtype: %s\n"
+                "col_translation[from_zone_col] Dtype: %s"
+                % (row_translation[from_zone_col].dtype, col_translation[from_zone_col].dtype)
+            )
+
+        # ## CHECK THE PASSED IN ARGUMENTS ARE VALID ## #
+        self._from_zones_index = pd.Index(from_unique_zones)
+        if validate:
+            self._validate_translations(
+                from_zone_col=from_zone_col,
+                to_unique_zones=to_unique_zones,
+                row_translation=row_translation,
+                col_translation=col_translation,
+            )
+
+        # ## SQUARE THE TRANSLATIONS ## #
+        wide_kwargs = {
+            'index_col': from_zone_col,
+            'columns_col': to_zone_col,
+            'values_col': factors_col,
+            'index_vals': from_unique_zones,
+            'column_vals': to_unique_zones,
+            'infill': translate_infill,
+        }
+        self.row_translation = pd_utils.long_to_wide_infill(
+            df=row_translation,
+            **wide_kwargs,
+        ).values
+
+        # Row and col translations are the same, don't need to square twice
+        if translation is not None:
+            self.col_translation = self.row_translation
+        else:
+            self.col_translation = pd_utils.long_to_wide_infill(
+                df=col_translation,
+                **wide_kwargs,
+            ).values
+
+        # Set up zone lookups for aligning matrices
+        self.from_unique_zones = np.asarray(from_unique_zones)
+        self.to_unique_zones = np.asarray(to_unique_zones)
+        self._from_zone_dtype = row_translation[from_zone_col].dtype
+        self._from_zone_sorter = np.argsort(self.from_unique_zones, kind="stable")
+
+    def _validate_translations(self,
+                               from_zone_col: str,
+                               to_unique_zones: List[Any],
+                               row_translation: pd.DataFrame,
+                               col_translation: pd.DataFrame,
+                               ) -> None:
+        """Checks the unique zones and warns about gaps in the translations"""
+        # Make sure there are no duplicates in from_unique_zones or to_unique_zones
+        if not self._from_zones_index.is_unique:
+            raise ValueError(
+                "Some zones went missing when converting from_unique_zones into "
+                "a set. This must mean there are some duplicate zones."
+            )
+
+        if not pd.Index(to_unique_zones).is_unique:
+            raise ValueError(
+                "Some zones went missing when converting to_unique_zones into "
+                "a set. This must mean there are some duplicate zones."
+            )
+
+        # Check all needed values are in from_zone_col zone col
+        missing_zones = self._from_zones_index.difference(
+            row_translation[from_zone_col].unique(),
+            sort=False,
+        )
+        if len(missing_zones) != 0:
+            warnings.warn(
+                "Some zones in the matrix are missing in the row translation! "
+                "Infilling missing zones with translation infill.\n"
+                "Missing zones count: %s"
+                % len(missing_zones)
+            )
+
+        if col_translation is row_translation:
+            return
+
+        missing_zones = self._from_zones_index.difference(
+            col_translation[from_zone_col].unique(),
+            sort=False,
+        )
+        if len(missing_zones) != 0:
+            warnings.warn(
+                "Some zones in the matrix are missing in the col translation! "
+                "Infilling missing zones with translation infill.\n"
+                "Missing zones count: %s"
+                % len(missing_zones)
+            )
+
+    def translate(self,
+                  matrix: pd.DataFrame,
+                  translation_dtype: np.dtype = None,
+                  matrix_infill: float = 0.0,
+                  check_totals: bool = False,
+                  chunk_size: int = 100,
+                  validate: bool = True,
+                  ) -> pd.DataFrame:
+        """Translates matrix into the to_zone system
+
+        Parameters
+        ----------
+        matrix:
+            The matrix to translate. The index and columns need to be the
+            from_zone_system ID
+
+        translation_dtype:
+            The numpy datatype to use to do the translation. If None, then
+            the dtype of the matrix is used, and matrix must only contain
+            floating point values. Where high precision
+            isn't needed, a more memory efficient dtype can be passed in
+            instead and the translation will be carried out in it.
+
+        matrix_infill:
+            The value to use to infill any missing matrix values.
+
+        check_totals:
+            Whether to check that the input and output matrices sum to the
+            same total.
+
+        chunk_size:
+            The size of the chunks to use if there isn't enough memory to do
+            the translation in one go. Most of the time this can be ignored
+            unless translating between two massive zoning systems.
+
+        validate:
+            Whether to warn about zones in matrix that are not in
+            from_unique_zones. Optionally set to False if checks have been
+            done externally to speed up runtime.
+
+        Returns
+        -------
+        translated_matrix:
+            matrix, translated into to_zone system.
+        """
+        # ## CHECK ZONE NAME DTYPES ## #
+        # Check the matrix index and column dtypes match
+        if matrix.columns.dtype != matrix.index.dtype:
+            raise ValueError(
+                "The datatype of the index and columns in matrix must be the same "
+                "for the zone translation to work.\n"
+                "Index Dtype: %s\n"
+                "Column Dtype: %s"
+                % (matrix.index.dtype, matrix.columns.dtype)
+            )
+
+        # Check the matrix and translation dtypes match
+        if matrix.index.dtype != self._from_zone_dtype:
+            raise ValueError(
+                "The datatype of the matrix index and columns must be the same "
+                "as the translation datatype in from_zone_col for the zone "
+                "translation to work.\n"
+                "matrix index Dtype: %s\n"
+                "translation[from_zone_col] Dtype: %s"
+                % (matrix.index.dtype, self._from_zone_dtype)
+            )
+
+        # Duplicate zones can't be placed in the square matrix
+        if not matrix.index.is_unique or not matrix.columns.is_unique:
+            raise ValueError(
+                "The index and columns of matrix must not contain duplicate "
+                "zones for the zone translation to work.\n"
+                "Duplicate index zones: %s\n"
+                "Duplicate column zones: %s"
+                % (
+                    matrix.index[matrix.index.duplicated()].unique().tolist(),
+                    matrix.columns[matrix.columns.duplicated()].unique().tolist(),
+                )
+            )
+
+        # ## CHECK MATRIX DTYPES ## #
+        # Integer dtypes would truncate the translation factors
+        if translation_dtype is None and not all(
+            pd.api.types.is_float_dtype(dtype) for dtype in matrix.dtypes
+        ):
+            raise ValueError(
+                "matrix must only contain floating point values for the zone "
+                "translation to work, otherwise the translation factors are "
+                "truncated. Set translation_dtype or convert matrix to floats.\n"
+                "matrix dtypes: %s"
+                % sorted(set(map(str, matrix.dtypes)))
+            )
+
+        # Make sure the matrix only has the zones defined in from_unique_zones
+        if validate:
+            missing_rows = matrix.index.difference(self._from_zones_index, sort=False)
+            if len(missing_rows) > 0:
+                warnings.warn(
+                    "There are some zones in matrix.index that have not been defined in "
+                    "from_unique_zones. These zones will be dropped before the "
+                    "translation!\n"
+                    "Additional rows count: %s"
+                    % len(missing_rows)
+                )
+
+            missing_cols = matrix.columns.difference(self._from_zones_index, sort=False)
+            if len(missing_cols) > 0:
+                warnings.warn(
+                    "There are some zones in matrix.columns that have not been defined in "
+                    "from_unique_zones. These zones will be dropped before the "
+                    "translation!"
+                    "Additional cols count: %s"
+                    % len(missing_cols)
+                )
+
+        # Make sure all zones are in the matrix and infill
+        wide_matrix = _reindex_square_matrix(
+            matrix=matrix,
+            unique_zones=self.from_unique_zones,
+            infill=matrix_infill,
+            sorter=self._from_zone_sorter,
+        )
+
+        # Translate
+        translated = numpy_matrix_zone_translation(
+            matrix=wide_matrix,
+            row_translation=self.row_translation,
+            col_translation=self.col_translation,
+            translation_dtype=translation_dtype,
+            check_shapes=False,
+            check_totals=check_totals,
+            chunk_size=chunk_size,
+        )
+
+        # Stick into pandas
+        return pd.DataFrame(
+            data=translated,
+            index=self.to_unique_zones,
+            columns=self.to_unique_zones,
+        )
+
+
 def pandas_matrix_zone_translation(matrix: pd.DataFrame,
                                    from_zone_col: str,
                                    to_zone_col: str,
@@ -454,6 +1198,7 @@ def pandas_matrix_zone_translation(matrix: pd.DataFrame,
                                    translate_infill: float = 0.0,
                                    check_totals: bool = False,
                                    chunk_size: int = 100,
+                                   validate: bool = True,
                                    ) -> pd.DataFrame:
     """Translates a Pandas DataFrame from one zoning system to another
 
@@ -526,159 +1271,39 @@ def pandas_matrix_zone_translation(matrix: pd.DataFrame,
         3D translation. Most of the time this can be ignored unless
         translating between two massive zoning systems.
 
+    validate:
+        Whether to check the given zones for duplicates and warn about
+        zones missing from matrix or the translations. Optionally set to
+        False if checks have been done externally to speed up runtime.
+
     Returns
     -------
     translated_matrix:
         matrix, translated into to_zone system.
-    """
-    # Init
-    if translation is not None:
-        row_translation = translation.copy()
-        col_translation = translation.copy()
-
-    if row_translation is None or col_translation is None:
-        raise ValueError(
-            "No translations have been given. Don't know how to translate. "
-            "Either translation needs to be set, or row_translation AND "
-            "col_translations needs to be set."
-        )
-
-    # ## CHECK ZONE NAME DTYPES ## #
-    # Check the matrix index and column dtypes match
-    if matrix.columns.dtype != matrix.index.dtype:
-        raise ValueError(
-            "The datatype of the index and columns in matrix must be the same "
-            "for the zone translation to work.\n"
-            "Index Dtype: %s\n"
-            "Column Dtype: %s"
-            % (matrix.index.dtype, matrix.columns.dtype)
-        )
-
-    # Check the matrix and translation dtypes match
-    if matrix.index.dtype != row_translation[from_zone_col].dtype:
-        raise ValueError(
-            "The datatype of the matrix index and columns must be the same "
-            "as the translation datatype in from_zone_col for the zone "
-            "translation to work.\n"
-            "matrix index Dtype: %s\n"
-            "row_translation[from_zone_col] Dtype: %s"
-            % (matrix.index.dtype, row_translation[from_zone_col].dtype)
-        )
-
-    if matrix.index.dtype != col_translation[from_zone_col].dtype:
-        raise ValueError(
-            "The datatype of the matrix index and columns must be the same "
-            "as the translation datatype in from_zone_col for the zone "
-            "translation to work.\n"
-            "matrix index Dtype: %s\n"
-            "col_translation[from_zone_col] Dtype: %s"
-            % (matrix.index.dtype, col_translation[from_zone_col].dtype)
-        )
-
-    # ## CHECK THE PASSED IN ARGUMENTS ARE VALID ## #
-    # Make sure there are no duplicates in from_unique_zones or to_unique_zones
-    if len(from_unique_zones) < len(set(from_unique_zones)):
-        raise ValueError(
-            "Some zones went missing when converting from_unique_zones into "
-            "a set. This must mean there are some duplicate zones."
-        )
 
-    if len(to_unique_zones) < len(set(to_unique_zones)):
-        raise ValueError(
-            "Some zones went missing when converting to_unique_zones into "
-            "a set. This must mean there are some duplicate zones."
-        )
-
-    # Make sure the matrix only has the zones defined in from_unique_zones
-    missing_rows = set(matrix.index.to_list()) - set(from_unique_zones)
-    if len(missing_rows) > 0:
-        warnings.warn(
-            "There are some zones in matrix.index that have not been defined in "
-            "from_unique_zones. These zones will be dropped before the "
-            "translation!\n"
-            "Additional rows count: %s"
-            % len(missing_rows)
-        )
-
-    missing_cols = set(matrix.columns.to_list()) - set(from_unique_zones)
-    if len(missing_cols) > 0:
-        warnings.warn(
-            "There are some zones in matrix.columns that have not been defined in "
-            "from_unique_zones. These zones will be dropped before the "
-            "translation!"
-            "Additional cols count: %s"
-            % len(missing_cols)
-        )
-
-    # Check all needed values are in from_zone_col zone col
-    trans_from_zones = set(row_translation[from_zone_col].unique())
-    missing_zones = (set(from_unique_zones) - trans_from_zones)
-    if len(missing_zones) != 0:
-        warnings.warn(
-            "Some zones in the matrix are missing in the row translation! "
-            "Infilling missing zones with translation infill.\n"
-            "Missing zones count: %s"
-            % len(missing_zones)
-        )
-
-    trans_from_zones = set(col_translation[from_zone_col].unique())
-    missing_zones = (set(from_unique_zones) - trans_from_zones)
-    if len(missing_zones) != 0:
-        warnings.warn(
-            "Some zones in the matrix are missing in the col translation! "
-            "Infilling missing zones with translation infill.\n"
-            "Missing zones count: %s"
-            % len(missing_zones)
-        )
-
-    # ## PREP AND TRANSLATE ## #
-    # Square the translation
-    row_translation = pd_utils.long_to_wide_infill(
-        df=row_translation,
-        index_col=from_zone_col,
-        columns_col=to_zone_col,
-        values_col=factors_col,
-        index_vals=from_unique_zones,
-        column_vals=to_unique_zones,
-        infill=translate_infill
-    )
-
-    # Can speed up with translation is not None - row and col translations are same
-    if translation is not None:
-        col_translation = row_translation.copy()
-    else:
-        col_translation = pd_utils.long_to_wide_infill(
-            df=col_translation,
-            index_col=from_zone_col,
-            columns_col=to_zone_col,
-            values_col=factors_col,
-            index_vals=from_unique_zones,
-            column_vals=to_unique_zones,
-            infill=translate_infill
-        )
-
-    # Make sure all zones are in the matrix and infill 0s
-    matrix = matrix.reindex(
-        index=from_unique_zones,
-        columns=from_unique_zones,
-        fill_value=matrix_infill,
+    See Also
+    --------
+    `ZoneTranslator`
+    """
+    translator = ZoneTranslator(
+        from_zone_col=from_zone_col,
+        to_zone_col=to_zone_col,
+        factors_col=factors_col,
+        from_unique_zones=from_unique_zones,
+        to_unique_zones=to_unique_zones,
+        translation=translation,
+        row_translation=row_translation,
+        col_translation=col_translation,
+        translate_infill=translate_infill,
+        validate=validate,
     )
-
-    # Translate
-    translated = numpy_matrix_zone_translation(
-        matrix=matrix.values,
-        row_translation=row_translation.values,
-        col_translation=col_translation.values,
+    return translator.translate(
+        matrix=matrix,
         translation_dtype=translation_dtype,
+        matrix_infill=matrix_infill,
         check_totals=check_totals,
         chunk_size=chunk_size,
-    )
-
-    # Stick into pandas
-    return pd.DataFrame(
-        data=translated,
-        index=to_unique_zones,
-        columns=to_unique_zones,
+        validate=validate,
     )
 
 
@@ -764,20 +1389,21 @@ def pandas_vector_zone_translation(vector: pd.DataFrame,
 
     # ## CHECK THE PASSED IN ARGUMENTS ARE VALID ## #
     # Make sure there are no duplicates in from_unique_zones or to_unique_zones
-    if len(from_unique_zones) < len(set(from_unique_zones)):
+    from_zones_index = pd.Index(from_unique_zones)
+    if not from_zones_index.is_unique:
         raise ValueError(
             "Some zones went missing when converting from_unique_zones into "
             "a set. This must mean there are some duplicate zones."
         )
 
-    if len(to_unique_zones) < len(set(to_unique_zones)):
+    if not pd.Index(to_unique_zones).is_unique:
         raise ValueError(
             "Some zones went missing when converting to_unique_zones into "
             "a set. This must mean there are some duplicate zones."
         )
 
     # Make sure the vector only has the zones defined in from_unique_zones
-    missing_rows = set(vector.index.to_list()) - set(from_unique_zones)
+    missing_rows = vector.index.difference(from_zones_index, sort=False)
     if len(missing_rows) > 0:
         warnings.warn(
             "There are some zones in vector.index that have not been defined in "
@@ -788,8 +1414,10 @@ def pandas_vector_zone_translation(vector: pd.DataFrame,
         )
 
     # Check all needed values are in from_zone_col zone col
-    trans_from_zones = set(translation[from_zone_col].unique())
-    missing_zones = (set(from_unique_zones) - trans_from_zones)
+    missing_zones = from_zones_index.difference(
+        translation[from_zone_col].unique(),
+        sort=False,
+    )
     if len(missing_zones) != 0:
         warnings.warn(
             "Some zones in the vector are missing in the translation! "
@@ -6,15 +6,18 @@ from __future__ import annotations
 # Standard imports
 import argparse
 import dataclasses
+import functools
 import pathlib
 import sys
 from typing import Union
 
 # Third party imports
 
-# Add parent and current folder to path to make normits_demand importable
-sys.path.append("..")
-sys.path.append(".")
+# Add parent and current folder to path to make normits_demand importable,
+# only when ran as a script so importing this module has no side effects
+if __name__ == "__main__":
+    sys.path.append("..")
+    sys.path.append(".")
 # Local imports
 # pylint: disable=import-error,wrong-import-position
 import normits_demand as nd
@@ -114,23 +117,26 @@ def main(
     else:
         raise NotImplementedError(f"forecasting not implemented for {model.value}")
 
-    if params.export_path.exists():
-        msg = "export folder already exists: %s"
-    else:
-        params.export_path.mkdir(parents=True)
+    export_path = params.export_path
+    try:
+        export_path.mkdir(parents=True)
         msg = "created export folder: %s"
+    except FileExistsError:
+        msg = "export folder already exists: %s"
     if init_logger:
         # Add log file output to main package logger
         nd_log.get_logger(
             nd_log.get_package_logger_name(),
-            params.export_path / LOG_FILE,
+            export_path / LOG_FILE,
             f"Running {model.value.upper()} forecast",
         )
-    LOG.info(msg, params.export_path)
-    LOG.info("Input parameters:\n%s", params.to_yaml())
+    LOG.info(msg, export_path)
+    # Only convert the parameters to YAML once for logging and saving
+    params_yaml = params.to_yaml()
+    LOG.info("Input parameters:\n%s", params_yaml)
 
-    output_params_file = params.export_path / "forecasting_parameters.yml"
-    params.save_yaml(output_params_file)
+    output_params_file = export_path / "forecasting_parameters.yml"
+    output_params_file.write_text(params_yaml)
     LOG.info("Saved input parameters to %s", output_params_file)
 
     if model in (forecast_cnfg.ForecastModel.TRIP_END, forecast_cnfg.ForecastModel.NTEM):
@@ -185,6 +191,19 @@ def model_mode_subset(
     return trip_ends.subset(segmentation)
 
 
+@functools.lru_cache(maxsize=4)
+def _ntem_import_matrices(
+    matrix_import_path: pathlib.Path, base_year: int, assignment_model: nd.AssignmentModel
+) -> ntem_forecast.NTEMImportMatrices:
+    """Get `NTEMImportMatrices`, reusing it for repeated runs in one process.
+
+    The base matrix paths found by the instance are kept, so
+    running multiple forecasts from the same base matrices only
+    searches for them once.
+    """
+    return ntem_forecast.NTEMImportMatrices(matrix_import_path, base_year, assignment_model)
+
+
 def tem_forecasting(
     params: Union[forecast_cnfg.TEMForecastParameters, forecast_cnfg.NTEMForecastParameters],
     forecast_model: forecast_cnfg.ForecastModel,
@@ -228,20 +247,21 @@ def tem_forecasting(
     else:
         raise ValueError(f"forecasting for trip end or NTEM only not {forecast_model}")
 
+    export_path = params.export_path
     if params.output_trip_end_data:
-        tripend_data.save(params.export_path / f"{trip_end_name} Data")
+        tripend_data.save(export_path / f"{trip_end_name} Data")
 
     tripend_data = model_mode_subset(tripend_data, params.assignment_model)
     tripend_growth = ntem_forecast.tempro_growth(
         tripend_data, params.assignment_model.get_zoning_system(), params.base_year
     )
     if params.output_trip_end_growth:
-        tripend_growth.save(params.export_path / f"{trip_end_name} Growth Factors")
+        tripend_growth.save(export_path / f"{trip_end_name} Growth Factors")
 
-    ntem_inputs = ntem_forecast.NTEMImportMatrices(
+    ntem_inputs = _ntem_import_matrices(
         params.matrix_import_path, params.base_year, params.assignment_model
     )
-    pa_output_folder = params.export_path / "Matrices" / "PA"
+    pa_output_folder = export_path / "Matrices" / "PA"
     ntem_forecast.grow_all_matrices(ntem_inputs, tripend_growth, pa_output_folder)
 
     ntem_forecast_checks.pa_matrix_comparison(
@@ -261,7 +281,7 @@ def tem_forecasting(
         params.assignment_model.get_mode().get_mode_values(),
         {"hb": params.hb_purposes_needed, "nhb": params.nhb_purposes_needed},
         params.pa_to_od_factors,
-        params.export_path,
+        export_path,
     )
 
     # Compile to output formats
@@ -19,7 +19,9 @@ from typing import Tuple
 # Third Party
 
 # Local Imports
-sys.path.append("..")
+# Only add the parent folder to the path when ran as a script
+if __name__ == '__main__':
+    sys.path.append("..")
 import normits_demand as nd
 
 from normits_demand import converters
@@ -53,6 +55,47 @@ REDUCE_SEG_BASE_NAME = '{te_model_name}_{trip_origin}_output_reduced'
 HB_SUBSET_SEG_BASE_NAME = '{te_model_name}_{trip_origin}_output_wday'
 NHB_SUBSET_SEG_BASE_NAME = '{te_model_name}_{trip_origin}_output_reduced_wday'
 
+# Suffix of the running segmentation names for each mode
+RUNNING_SEG_MODE_NAMES = {
+    nd.Mode.WALK: 'walk',
+    nd.Mode.CYCLE: 'cycle',
+    nd.Mode.BUS: 'bus',
+}
+
+
+def _build_distributor(
+    trip_origin: nd.TripOrigin,
+    trip_end_getter: converters.NoTEMToDistributionModel,
+    trip_end_kwargs: dict,
+    running_segmentation: nd.SegmentationLevel,
+    upper_init_params_fname: str,
+    lower_init_params_fname: str,
+    upper_target_tld_dir: str,
+    lower_target_tld_dir: str,
+    compile_zoning_system: nd.ZoningSystem,
+    dmab_kwargs: dict,
+    dm_kwargs: dict,
+) -> DistributionModel:
+    """Build the argument builder and DistributionModel for trip_origin"""
+    arg_builder = DistributionModelArgumentBuilder(
+        trip_origin=trip_origin,
+        trip_end_getter=trip_end_getter,
+        trip_end_kwargs=trip_end_kwargs,
+        running_segmentation=running_segmentation,
+        upper_init_params_fname=upper_init_params_fname,
+        lower_init_params_fname=lower_init_params_fname,
+        upper_target_tld_dir=upper_target_tld_dir,
+        lower_target_tld_dir=lower_target_tld_dir,
+        **dmab_kwargs,
+    )
+
+    return DistributionModel(
+        arg_builder=arg_builder,
+        compile_zoning_system=compile_zoning_system,
+        **dm_kwargs,
+        **arg_builder.build_distribution_model_init_args(),
+    )
+
 
 def main():
     # mode = nd.Mode.WALK
@@ -76,46 +119,22 @@ def main():
     lower_zoning_system = nd.get_zoning_system('tfgm_pt')
     compile_zoning_system = None
 
-    if mode == nd.Mode.WALK:
-        # Define cost arguments
-        intrazonal_cost_infill = 0.5
-
-        # Define segmentations for trip ends and running
-        hb_agg_seg = nd.get_segmentation_level('hb_p_m')
-        nhb_agg_seg = nd.get_segmentation_level('dimo_nhb_p_m_tp_wday')
-        hb_running_seg = nd.get_segmentation_level('hb_p_m_walk')
-        nhb_running_seg = nd.get_segmentation_level('dimo_nhb_p_m_tp_wday_walk')
-        hb_seg_name = 'p_m'
-        nhb_seg_name = 'p_m_tp'
-
-    elif mode == nd.Mode.CYCLE:
-        # Define cost arguments
-        intrazonal_cost_infill = 0.5
-
-        # Define segmentations for trip ends and running
-        hb_agg_seg = nd.get_segmentation_level('hb_p_m')
-        nhb_agg_seg = nd.get_segmentation_level('dimo_nhb_p_m_tp_wday')
-        hb_running_seg = nd.get_segmentation_level('hb_p_m_cycle')
-        nhb_running_seg = nd.get_segmentation_level('dimo_nhb_p_m_tp_wday_cycle')
-        hb_seg_name = 'p_m'
-        nhb_seg_name = 'p_m_tp'
-
-    elif mode == nd.Mode.BUS:
-        # Define cost arguments
-        intrazonal_cost_infill = 0.5
-
-        # Define segmentations for trip ends and running
-        hb_agg_seg = nd.get_segmentation_level('hb_p_m')
-        nhb_agg_seg = nd.get_segmentation_level('dimo_nhb_p_m_tp_wday')
-        hb_running_seg = nd.get_segmentation_level('hb_p_m_bus')
-        nhb_running_seg = nd.get_segmentation_level('dimo_nhb_p_m_tp_wday_bus')
-        hb_seg_name = 'p_m'
-        nhb_seg_name = 'p_m_tp'
-
-    else:
+    if mode not in RUNNING_SEG_MODE_NAMES:
         raise ValueError(
             f"Don't know what mode {mode.value} is!"
         )
+    running_seg_mode = RUNNING_SEG_MODE_NAMES[mode]
+
+    # Define cost arguments
+    intrazonal_cost_infill = 0.5
+
+    # Define segmentations for trip ends and running
+    hb_agg_seg = nd.get_segmentation_level('hb_p_m')
+    nhb_agg_seg = nd.get_segmentation_level('dimo_nhb_p_m_tp_wday')
+    hb_running_seg = nd.get_segmentation_level(f'hb_p_m_{running_seg_mode}')
+    nhb_running_seg = nd.get_segmentation_level(f'dimo_nhb_p_m_tp_wday_{running_seg_mode}')
+    hb_seg_name = 'p_m'
+    nhb_seg_name = 'p_m_tp'
 
     # ## DEFINE HOW TO RUN DISTRIBUTIONS ## #
     # Define target tld dirs
@@ -241,14 +260,13 @@ def main():
         nhb_lower_init_params_fname = None
 
     # ## RUN THE MODEL ## #
-    if run_hb:
+    def build_hb_distributor() -> DistributionModel:
+        """Build the HB model, needed to run or compile it"""
         trip_origin = nd.TripOrigin.HB
 
         # Build the trip end kwargs
-        subset_name = HB_SUBSET_SEG_BASE_NAME.format(
-            trip_origin=trip_origin.value,
-            te_model_name=te_model_name,
-        )
+        kwargs = {'trip_origin': trip_origin.value, 'te_model_name': te_model_name}
+        subset_name = HB_SUBSET_SEG_BASE_NAME.format(**kwargs)
         trip_end_kwargs = {
             'reduce_segmentation': None,
             'subset_segmentation': nd.get_segmentation_level(subset_name),
@@ -256,7 +274,7 @@ def main():
             'modal_segmentation': hb_running_seg,
         }
 
-        arg_builder = DistributionModelArgumentBuilder(
+        return _build_distributor(
             trip_origin=trip_origin,
             trip_end_getter=trip_end_getter,
             trip_end_kwargs=trip_end_kwargs,
@@ -265,24 +283,26 @@ def main():
             lower_init_params_fname=hb_lower_init_params_fname,
             upper_target_tld_dir=upper_hb_target_tld_dir,
             lower_target_tld_dir=lower_hb_target_tld_dir,
-            **dmab_kwargs,
-        )
-
-        hb_distributor = DistributionModel(
-            arg_builder=arg_builder,
             compile_zoning_system=compile_zoning_system,
-            **dm_kwargs,
-            **arg_builder.build_distribution_model_init_args(),
+            dmab_kwargs=dmab_kwargs,
+            dm_kwargs=dm_kwargs,
         )
 
-        hb_distributor.run(
-            run_all=run_all,
-            run_upper_model=run_upper_model,
-            run_lower_model=run_lower_model,
-            run_pa_matrix_reports=run_pa_matrix_reports,
-            run_pa_to_od=run_pa_to_od,
-            run_od_matrix_reports=run_od_matrix_reports,
-        )
+    run_kwargs = {
+        'run_all': run_all,
+        'run_upper_model': run_upper_model,
+        'run_lower_model': run_lower_model,
+        'run_pa_matrix_reports': run_pa_matrix_reports,
+        'run_pa_to_od': run_pa_to_od,
+        'run_od_matrix_reports': run_od_matrix_reports,
+    }
+
+    hb_distributor = None
+    nhb_distributor = None
+
+    if run_hb:
+        hb_distributor = build_hb_distributor()
+        hb_distributor.run(**run_kwargs)
 
     if run_nhb:
         trip_origin = nd.TripOrigin.NHB
@@ -298,7 +318,7 @@ def main():
             'modal_segmentation': nhb_running_seg,
         }
 
-        arg_builder = DistributionModelArgumentBuilder(
+        nhb_distributor = _build_distributor(
             trip_origin=trip_origin,
             trip_end_getter=trip_end_getter,
             trip_end_kwargs=trip_end_kwargs,
@@ -307,53 +327,21 @@ def main():
             lower_init_params_fname=nhb_lower_init_params_fname,
             upper_target_tld_dir=upper_nhb_target_tld_dir,
             lower_target_tld_dir=lower_nhb_target_tld_dir,
-            **dmab_kwargs,
-        )
-
-        nhb_distributor = DistributionModel(
-            arg_builder=arg_builder,
             compile_zoning_system=compile_zoning_system,
-            **dm_kwargs,
-            **arg_builder.build_distribution_model_init_args(),
-        )
-
-        nhb_distributor.run(
-            run_all=run_all,
-            run_upper_model=run_upper_model,
-            run_lower_model=run_lower_model,
-            run_pa_matrix_reports=run_pa_matrix_reports,
-            run_pa_to_od=run_pa_to_od,
-            run_od_matrix_reports=run_od_matrix_reports,
+            dmab_kwargs=dmab_kwargs,
+            dm_kwargs=dm_kwargs,
         )
+        nhb_distributor.run(**run_kwargs)
 
     # TODO(BT): Move this into Matrix tools!
     #  Fudged to get this to work for now. Handle this better!
     if compile_to_assignment:
-        if 'hb_distributor' in locals():
+        if hb_distributor is not None:
             hb_distributor.compile_to_assignment_format()
-        elif 'nhb_distributor' in locals():
+        elif nhb_distributor is not None:
             nhb_distributor.compile_to_assignment_format()
         else:
-            trip_origin = nd.TripOrigin.HB
-            arg_builder = DistributionModelArgumentBuilder(
-                trip_origin=trip_origin,
-                trip_end_getter=trip_end_getter,
-                trip_end_kwargs=trip_end_kwargs,
-                running_segmentation=hb_running_seg,
-                upper_init_params_fname=hb_upper_init_params_fname,
-                lower_init_params_fname=hb_lower_init_params_fname,
-                upper_target_tld_dir=upper_hb_target_tld_dir,
-                lower_target_tld_dir=lower_hb_target_tld_dir,
-                **dmab_kwargs,
-            )
-
-            hb_distributor = DistributionModel(
-                arg_builder=arg_builder,
-                compile_zoning_system=compile_zoning_system,
-                **dm_kwargs,
-                **arg_builder.build_distribution_model_init_args(),
-            )
-
+            hb_distributor = build_hb_distributor()
             hb_distributor.compile_to_assignment_format()
 
 
@@ -2,130 +2,268 @@
 """Run Script for the EDGE CUBE extractor."""
 # ## IMPORTS ## #
 # Standard imports
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import hashlib
 import os
 import sys
 import shutil
+from typing import Optional
 
 # Third party imports
 from pathlib import Path
-from tqdm import tqdm
 
+import pandas as pd
+import pydantic
 
 # Local imports
 sys.path.append(".")
 sys.path.append("..")
 from normits_demand import logging as nd_log
+from normits_demand.concurrency import multiprocessing, multithreading
 from normits_demand.tools import edge_cube_extractor
-from normits_demand.utils import file_ops
-
-# TODO (MI) Setup user inputs using BaseConfig
-
-# ## USER INPUTS ## #
-# cube catalogue setup
-CUBE_EXE = Path("C:/Program Files/Citilabs/CubeVoyager/VOYAGER.EXE")
-CUBE_CAT_PATH = Path(r"C:\NorMITs\NorTMS_T3_Model_v8.16b")
-CAT_RUN_DIR = "Runs"
-CUBE_RUN_ID = "ILP_2018"
-
-# process parts
-# EXPORT_MATRICES to export NoRMS base matrices into CSVs
-# EXPORT_TLC to NoRMS <-> MOIRA TLCs Lookup
-EXPORT_MATRICES = True
-EXPORT_TLC = True
-
-# Input files
-TLC_OVERWRITE_PATH = Path(r"C:\NorMITs\inputs\TLC_Overwrite_EDGE.csv")
-
-# Output location
-OUT_PATH = Path(r"C:\NorMITs\outputs")
+from normits_demand.utils import config_base, file_ops
 
 # ## CONSTANTS ## #
 # logger
 LOG_FILE = "Export_BaseMatrices_Logfile.Log"
 LOG = nd_log.get_logger(f"{nd_log.get_package_logger_name()}.run_edge_cube_extractor")
+# Included in the TLC lookup cache hash, increase when changing how the lookup is built
+TLC_CACHE_VERSION = 1
 
-# Derived from inputs
-CUBE_CAT_RUN_PATH = CUBE_CAT_PATH / CAT_RUN_DIR / CUBE_RUN_ID
 
 # ## CLASSES ## #
+class EDGECubeExtractorParameters(config_base.BaseConfig):
+    """Parameters for running the EDGE CUBE extractor.
+
+    Defaults are used for any parameters not given in the config
+    file, so separate runs can be set up with a config file each.
+    """
+
+    # cube catalogue setup
+    cube_exe: Path = Path("C:/Program Files/Citilabs/CubeVoyager/VOYAGER.EXE")
+    cube_cat_path: Path = Path(r"C:\NorMITs\NorTMS_T3_Model_v8.16b")
+    cat_run_dir: str = "Runs"
+    cube_run_id: str = "ILP_2018"
+
+    # process parts
+    # export_matrices to export NoRMS base matrices into CSVs
+    # export_tlc to NoRMS <-> MOIRA TLCs Lookup
+    export_matrices: bool = True
+    export_tlc: bool = True
+    # rerun CUBE to produce the PT period matrices even if they're up to date
+    rebuild_pt_demand: bool = False
+
+    # Input files
+    tlc_overwrite_path: Path = Path(r"C:\NorMITs\inputs\TLC_Overwrite_EDGE.csv")
+
+    # Output location
+    out_path: Path = Path(r"C:\NorMITs\outputs")
+    # TLC lookup file type, any type supported by file_ops.write_df e.g. ".csv.bz2"
+    # for a compressed CSV, which EDGE can read directly
+    tlc_out_suffix: str = ".csv"
+    # Matrices file type, the EDGE replicant expects ".csv" but any type supported
+    # by file_ops.write_df can be used e.g. ".csv.bz2" to reduce disk space
+    matrix_out_suffix: str = ".csv"
+
+    @property
+    def cube_cat_run_path(self) -> Path:
+        """Folder containing the CUBE run inputs and outputs."""
+        return self.cube_cat_path / self.cat_run_dir / self.cube_run_id
+
+
+@dataclasses.dataclass
+class EDGECubeExtractorArguments:
+    """Command line arguments for the EDGE CUBE extractor.
+
+    Attributes
+    ----------
+    config_path: pathlib.Path, optional
+        Path to config file, if not given the default
+        parameters are used.
+    """
+
+    config_path: Optional[Path] = None
+
+    @classmethod
+    def parse(cls) -> EDGECubeExtractorArguments:
+        """Parse command line arguments."""
+        parser = argparse.ArgumentParser(
+            description=__doc__, formatter_class=argparse.ArgumentDefaultsHelpFormatter
+        )
+        parser.add_argument(
+            "config",
+            nargs="?",
+            default=cls.config_path,
+            type=Path,
+            help="path to config file containing parameters",
+        )
+
+        parsed_args = parser.parse_args()
+        return EDGECubeExtractorArguments(parsed_args.config)
+
+    def validate(self) -> None:
+        """Raise error if any arguments are invalid."""
+        if self.config_path is not None and not self.config_path.is_file():
+            raise FileNotFoundError(f"config file doesn't exist: {self.config_path}")
 
 
 # ## FUNCTIONS ## #
-def run_extractor():
+def _stns_tlc_lookup(
+    params: EDGECubeExtractorParameters, tlc_overwrite: pd.DataFrame
+) -> pd.DataFrame:
+    """Produce the station zone to TLC lookup, or read it from cache.
+
+    The cache is stored in a "cache" folder in `params.out_path`,
+    alongside a hash of the network inputs, `tlc_overwrite` and
+    `TLC_CACHE_VERSION`. It's only reused when the hash matches, and
+    is overwritten otherwise.
+    """
+    network_dir = params.cube_cat_run_path / "Inputs/Network"
+    network_paths = [
+        network_dir / "Station_Connectors.csv",
+        network_dir / "TfN_Rail_Nodes.csv",
+        network_dir / "External_Station_Nodes.csv",
+    ]
+    # reading the files raises FileNotFoundError for missing files
+    inputs_hash = hashlib.blake2b(digest_size=16)
+    for path in network_paths:
+        inputs_hash.update(path.read_bytes())
+    inputs_hash.update(tlc_overwrite.to_csv(index=False).encode())
+    inputs_hash.update(str(TLC_CACHE_VERSION).encode())
+
+    cache_path = params.out_path / "cache" / "tlc_lookup.csv"
+    hash_path = cache_path.with_suffix(".hash")
+    try:
+        if hash_path.read_text() == inputs_hash.hexdigest():
+            stns_tlc = file_ops.read_df(cache_path)
+            LOG.info("TLC lookup read from cache: %s", cache_path)
+            return stns_tlc
+    except FileNotFoundError:
+        pass
+
+    stns_tlc = edge_cube_extractor.stnzone_2_stn_tlc(*network_paths, tlc_overwrite)
+    # remove the hash first, so a failed write can't leave a cache which looks valid
+    hash_path.unlink(missing_ok=True)
+    cache_path.parent.mkdir(exist_ok=True)
+    file_ops.write_df(stns_tlc, cache_path, index=False)
+    hash_path.write_text(inputs_hash.hexdigest())
+    return stns_tlc
+
+
+def run_extractor(params: EDGECubeExtractorParameters):
     """Process Fixed objects."""
+    out_path = params.out_path
+    cube_cat_run_path = params.cube_cat_run_path
 
-    if EXPORT_TLC:
+    if params.export_tlc:
         # produce TLC lookup
-        file_ops.check_file_exists(TLC_OVERWRITE_PATH)
-        tlc_overwrite = file_ops.read_df(TLC_OVERWRITE_PATH)
-        stns_tlc = edge_cube_extractor.stnzone_2_stn_tlc(
-            CUBE_CAT_RUN_PATH / "Inputs/Network/Station_Connectors.csv",
-            CUBE_CAT_RUN_PATH / "Inputs/Network/TfN_Rail_Nodes.csv",
-            CUBE_CAT_RUN_PATH / "Inputs/Network/External_Station_Nodes.csv",
-            tlc_overwrite,
-        )
+        # only the TLC columns are used, so skip parsing any others
+        try:
+            tlc_overwrite = file_ops.read_df(
+                params.tlc_overwrite_path, usecols=["NoRMS", "Overwrite"], dtype=str
+            )
+        except FileNotFoundError:
+            LOG.error("TLC overwrite file not found: %s", params.tlc_overwrite_path)
+            raise
+        stns_tlc = _stns_tlc_lookup(params, tlc_overwrite)
 
         # write TLC Lookup
-        file_ops.write_df(stns_tlc, OUT_PATH / "TLCs.csv", index=False)
+        file_ops.write_df(stns_tlc, out_path / f"TLCs{params.tlc_out_suffix}", index=False)
 
         LOG.info("TLCs overwrite file exported")
 
-    if EXPORT_MATRICES:
+    if params.export_matrices:
         # time periods
         periods = ["AM", "IP", "PM", "OP"]
 
-        # copy Cube files
-        for period in periods:
-            # read distance matrix
-            file_ops.check_file_exists(
-                CUBE_CAT_RUN_PATH / f"Outputs/BaseAssign/{period}_stn2stn_costs.csv"
-            )
-            shutil.copy2(
-                CUBE_CAT_RUN_PATH / f"Outputs/BaseAssign/{period}_stn2stn_costs.csv",
-                OUT_PATH / f"{period}_stn2stn_costs.csv",
-            )
+        # copy Cube distance matrices and iRSj props, checking all exist before copying
+        copy_files = [
+            f"{period}_{name}"
+            for period in periods
+            for name in ("stn2stn_costs.csv", "iRSj_probabilities.h5")
+        ]
+        base_assign_dir = cube_cat_run_path / "Outputs/BaseAssign"
+        for name in copy_files:
+            file_ops.check_file_exists(base_assign_dir / name)
 
-            # read iRSj props
-            file_ops.check_file_exists(
-                CUBE_CAT_RUN_PATH / f"Outputs/BaseAssign/{period}_iRSj_probabilities.h5"
-            )
-            shutil.copy2(
-                CUBE_CAT_RUN_PATH / f"Outputs/BaseAssign/{period}_iRSj_probabilities.h5",
-                OUT_PATH / f"{period}_iRSj_probabilities.h5",
+        # copies are IO bound so run them on threads
+        threads = []
+        for name in copy_files:
+            thread = multithreading.ReturnOrErrorThread(
+                target=shutil.copyfile,
+                args=(base_assign_dir / name, out_path / name),
             )
-
-            LOG.info("Distance and Probability matrices for period %s has been copied", period)
+            thread.start()
+            threads.append(thread)
+        multithreading.wait_for_thread_return_or_error(
+            threads,
+            pbar_kwargs={"desc": "Copying Cube outputs", "unit": "File", "mininterval": 1.0},
+        )
+        LOG.info("Distance and Probability matrices for periods %s have been copied", periods)
 
         # PT Demand to time periods F/T
         edge_cube_extractor.pt_demand_from_to(
-            CUBE_EXE, CUBE_CAT_PATH, CUBE_CAT_RUN_PATH, OUT_PATH
+            params.cube_exe,
+            params.cube_cat_path,
+            cube_cat_run_path,
+            out_path,
+            skip_if_current=not params.rebuild_pt_demand,
         )
         LOG.info("NoRMS matrices converted to OMX successfully")
 
-        # export to CSVs
-        for period in tqdm(periods, desc="Time Periods Loop ", unit="Period"):
-            edge_cube_extractor.export_mat_2_csv_via_omx(
-                CUBE_EXE, OUT_PATH / f"PT_{period}.MAT", OUT_PATH, f"{period}", f"{period}"
-            )
-            LOG.info(f"{period} NoRMS matrices exported to CSVs")
+        # export to CSVs, periods are independent so export them in parallel
+        kwarg_list = [
+            {
+                "cube_exe": params.cube_exe,
+                "in_mat": out_path / f"PT_{period}.MAT",
+                "out_path": out_path,
+                "out_csv": f"{period}",
+                "segment": f"{period}",
+                "out_suffix": params.matrix_out_suffix,
+            }
+            for period in periods
+        ]
+        multiprocessing.multiprocess(
+            fn=edge_cube_extractor.export_mat_2_csv_via_omx,
+            kwargs=kwarg_list,
+            # leave a CPU free, 0 runs in serial, cpu_count is None if it's unknown
+            process_count=min(len(periods), (os.cpu_count() or 1) - 1),
+            pbar_kwargs={"desc": "Time Periods Loop ", "unit": "Period", "mininterval": 1.0},
+        )
+        LOG.info("%s NoRMS matrices exported to CSVs", ", ".join(periods))
 
         LOG.info("#" * 80)
         LOG.info("Process Finished Successfully")
         LOG.info("#" * 80)
 
 
-def main():
+def main(params: EDGECubeExtractorParameters):
     """Main Function."""
     # Set up a logger to capture all log outputs and warnings
     nd_log.get_logger(
         logger_name=nd_log.get_package_logger_name(),
-        log_file_path=os.path.join(OUT_PATH, LOG_FILE),
+        log_file_path=os.path.join(params.out_path, LOG_FILE),
         instantiate_msg="Export NoRMS Base Demand",
         log_version=True,
     )
-    nd_log.capture_warnings(file_handler_args=dict(log_file=OUT_PATH / LOG_FILE))
-    run_extractor()
+    nd_log.capture_warnings(file_handler_args=dict(log_file=params.out_path / LOG_FILE))
+    run_extractor(params)
 
 
 if __name__ == "__main__":
-    main()
+    args = EDGECubeExtractorArguments.parse()
+    args.validate()
+
+    if args.config_path is None:
+        parameters = EDGECubeExtractorParameters()
+    else:
+        try:
+            parameters = EDGECubeExtractorParameters.load_yaml(args.config_path)
+        except pydantic.ValidationError as error:
+            LOG.critical("Config file error: %s", error)
+            raise SystemExit(1) from error
+
+    main(parameters)
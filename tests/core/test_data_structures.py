@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+    Module for testing functions in normits_demand.core.data_structures module.
+"""
+
+##### IMPORTS #####
+# Standard imports
+
+# Third party imports
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local imports
+import normits_demand as nd
+from normits_demand import core
+
+
+##### CONSTANTS #####
+ZONES = np.array(["a", "b", "c"])
+
+
+##### FUNCTIONS #####
+@pytest.fixture(name="dvec")
+def fixture_dvec() -> nd.DVector:
+    """Empty DVector with string zones and a single segment, p, of 1, 2 or 3."""
+    segmentation = core.SegmentationLevel(
+        name="test_p",
+        naming_order=["p"],
+        segment_types={"p": int},
+        valid_segments=pd.DataFrame({"p": [1, 2, 3]}),
+    )
+    zoning = core.ZoningSystem(name="test", unique_zones=ZONES)
+    return nd.DVector(segmentation, {}, zoning_system=zoning, process_count=0)
+
+
+def _df_chunk(dvec: nd.DVector, segments: list, zones: list, vals: list) -> pd.DataFrame:
+    """DataFrame chunk with the internal segment, zone and value columns of `dvec`."""
+    return pd.DataFrame({
+        dvec._segment_col: segments,
+        dvec._zone_col: zones,
+        dvec._val_col: vals,
+    })
+
+
+def test_dataframe_to_dvec_internal(dvec: nd.DVector):
+    """Test rows are placed in their segment and zone, infilling missing zones with 0.
+
+    Segment 3 isn't in the DataFrame so shouldn't be in the output, it's
+    infilled by the calling function.
+    """
+    df_chunk = _df_chunk(
+        dvec,
+        segments=["2", "1", "1", "2"],
+        zones=["a", "c", "a", "b"],
+        vals=[4.0, 2.0, 1.0, 3.0],
+    )
+
+    data = dvec._dataframe_to_dvec_internal(df_chunk)
+
+    assert data.keys() == {"1", "2"}
+    np.testing.assert_array_equal(data["1"], [1.0, 0.0, 2.0])
+    np.testing.assert_array_equal(data["2"], [4.0, 3.0, 0.0])
+
+
+@pytest.mark.parametrize(
+    ["segments", "zones", "message"],
+    [
+        (["1", "9"], ["a", "b"], "9 is not a valid segment name"),
+        (["1", np.nan], ["a", "b"], "nan is not a valid segment name"),
+        (
+            ["1", "2", "2"],
+            ["a", "b", "b"],
+            "repeated values for some of the zones in segment 2. Found 2 segments, "
+            "but only 1 of them are unique",
+        ),
+        (["1", "2"], ["a", "z"], r"For segment 2, the following zones .*\n\{'z'\}"),
+    ],
+)
+def test_dataframe_to_dvec_internal_errors(
+    dvec: nd.DVector, segments: list, zones: list, message: str
+):
+    """Test the correct error is raised for invalid segments, and duplicate or unknown zones."""
+    df_chunk = _df_chunk(dvec, segments, zones, vals=np.ones(len(segments)))
+
+    with pytest.raises(ValueError, match=message):
+        dvec._dataframe_to_dvec_internal(df_chunk)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+    Module for testing functions in normits_demand.matrices.pa_to_od module.
+"""
+
+##### IMPORTS #####
+# Standard imports
+from pathlib import Path
+from typing import Dict
+
+# Third party imports
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local imports
+from normits_demand.concurrency import multithreading
+from normits_demand.matrices import pa_to_od
+
+
+##### CONSTANTS #####
+MODEL_NAME = "test"
+CALIB_PARAMS = {"yr": 2018, "p": 1, "m": 6}
+TPS = [1, 2, 3, 4]
+ROUND_DP = 6
+
+
+##### FUNCTIONS #####
+def test_zone_nums_from_col():
+    """Test whole number zone ids read in as floats are converted to integers."""
+    zone_nums = pa_to_od._zone_nums_from_col(np.array([1.0, 2.0, 10.0]), "matrix.csv")
+
+    assert zone_nums.dtype == np.int64
+    np.testing.assert_array_equal(zone_nums, [1, 2, 10])
+
+
+@pytest.mark.parametrize("bad_zone", [1.5, np.nan])
+def test_zone_nums_from_col_not_integer(bad_zone: float):
+    """Test the correct error is raised for non-integer zone ids."""
+    with pytest.raises(ValueError, match="non-integer zone ids"):
+        pa_to_od._zone_nums_from_col(np.array([1.0, bad_zone]), "matrix.csv")
+
+
+def test_read_square_matrix_not_numeric(tmp_path: Path):
+    """Test the correct error is raised for non-numeric zone ids."""
+    path = tmp_path / "matrix.csv"
+    path.write_text("zone_id,A,B\nA,1.0,2.0\nB,3.0,4.0\n")
+
+    thread = pa_to_od._ReadSquareMatrixThread(str(path))
+    thread.start()
+    with pytest.raises(multithreading.MultithreadingError) as error:
+        multithreading.wait_for_thread_return_or_error([thread])
+
+    assert isinstance(error.value.__cause__, ValueError)
+    assert "numeric matrix" in str(error.value.__cause__)
+
+
+@pytest.fixture(name="phi_factors")
+def fixture_phi_factors() -> pd.DataFrame:
+    """Simplified phi factors for purpose 1, with every from_home tp splitting into
+    all the to_home tps, and an extra purpose which should be ignored."""
+    rng = np.random.default_rng(1)
+    factors = []
+    for purpose in (1, 2):
+        splits = rng.random((len(TPS), len(TPS)))
+        splits /= splits.sum(axis=1, keepdims=True)
+        for i, from_tp in enumerate(TPS):
+            for j, to_tp in enumerate(TPS):
+                factors.append((purpose, from_tp, to_tp, splits[i, j]))
+
+    return pd.DataFrame(
+        factors,
+        columns=["purpose_from_home", "time_from_home", "time_to_home", "direction_factor"],
+    )
+
+
+@pytest.fixture(name="pa_matrices")
+def fixture_pa_matrices(tmp_path: Path) -> Dict[int, np.ndarray]:
+    """Write a from_home PA CSV for each tp, returns the matrices by tp."""
+    rng = np.random.default_rng(2)
+    zones = [1, 2, 5]
+    header = ",".join([f"{MODEL_NAME}_zone_id"] + [str(z) for z in zones])
+
+    pa_matrices = {}
+    for tp in TPS:
+        pa = np.round(rng.random((len(zones), len(zones))) * 100, 3)
+        np.savetxt(
+            tmp_path / f"hb_pa_yr2018_p1_m6_tp{tp}.csv",
+            np.column_stack([zones, pa]),
+            fmt=["%d"] + ["%.3f"] * len(zones),
+            delimiter=",",
+            header=header,
+            comments="",
+        )
+        pa_matrices[tp] = pa
+
+    return pa_matrices
+
+
+def _read_od(folder: Path, name: str, tp: int) -> np.ndarray:
+    """Read an OD matrix written by `_build_od_internal`, without the zone column."""
+    path = folder / f"hb_{name}_yr2018_p1_m6_tp{tp}.csv"
+    return np.loadtxt(path, delimiter=",", skiprows=1)[:, 1:]
+
+
+def test_build_od_internal(
+    tmp_path: Path, pa_matrices: Dict[int, np.ndarray], phi_factors: pd.DataFrame
+):
+    """Test the from_home, to_home and full OD matrices are built correctly.
+
+    The from_home OD should match the PA, the to_home OD should be the
+    transposed from_home PA split by the phi factors and the full OD should
+    be the sum of both.
+    """
+    od_export = tmp_path / "od"
+    od_export.mkdir()
+    totals = pa_to_od._build_od_internal(
+        str(tmp_path),
+        str(od_export),
+        MODEL_NAME,
+        CALIB_PARAMS,
+        phi_factors,
+        ROUND_DP,
+        full_od_out=True,
+        echo=False,
+    )
+
+    phi = phi_factors[phi_factors["purpose_from_home"] == 1].pivot(
+        index="time_from_home", columns="time_to_home", values="direction_factor"
+    )
+    atol = 10**-ROUND_DP
+    for i, tp in enumerate(TPS):
+        od_from = _read_od(od_export, "od_from", tp)
+        od_to = _read_od(od_export, "od_to", tp)
+        od = _read_od(od_export, "od", tp)
+
+        expected_to = sum(phi.loc[f, tp] * pa_matrices[f].T for f in TPS)
+
+        np.testing.assert_array_equal(od_from, pa_matrices[tp])
+        np.testing.assert_allclose(od_to, expected_to, rtol=0, atol=atol)
+        np.testing.assert_allclose(od, od_from + od_to, rtol=0, atol=2 * atol)
+
+        name, from_total, to_total = totals[i]
+        assert name == f"hb_pa_yr2018_p1_m6_tp{tp}.csv"
+        assert from_total == pytest.approx(pa_matrices[tp].sum())
+        assert to_total == pytest.approx(expected_to.sum())
+
+
+@pytest.mark.usefixtures("pa_matrices")
+def test_build_od_internal_missing_tp(tmp_path: Path, phi_factors: pd.DataFrame):
+    """Test the correct error is raised when a tp PA matrix is missing."""
+    (tmp_path / "hb_pa_yr2018_p1_m6_tp3.csv").unlink()
+
+    with pytest.raises(ValueError, match=r"Missing time periods: \['tp3'\]"):
+        pa_to_od._build_od_internal(
+            str(tmp_path), str(tmp_path), MODEL_NAME, CALIB_PARAMS, phi_factors, ROUND_DP
+        )
+
+
+@pytest.mark.usefixtures("pa_matrices")
+def test_build_od_internal_missing_phi(tmp_path: Path, phi_factors: pd.DataFrame):
+    """Test the correct error is raised when a tp pair has no phi factor."""
+    missing = (phi_factors["time_from_home"] == 2) & (phi_factors["time_to_home"] == 4)
+
+    with pytest.raises(ValueError, match="Phi factors are missing"):
+        pa_to_od._build_od_internal(
+            str(tmp_path),
+            str(tmp_path),
+            MODEL_NAME,
+            CALIB_PARAMS,
+            phi_factors.loc[~missing],
+            ROUND_DP,
+        )
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+    Module for testing functions in normits_demand.models.forecasting.forecast_cnfg module.
+"""
+
+##### IMPORTS #####
+# Standard imports
+from pathlib import Path
+
+# Third party imports
+import pytest
+
+# Local imports
+# forecast_cnfg needs pyodbc, via ntem_extractor, which needs the ODBC system libraries
+forecast_cnfg = pytest.importorskip("normits_demand.models.forecasting.forecast_cnfg")
+
+
+##### FUNCTIONS #####
+def test_format_field_names():
+    """Test only the replacement fields which are in `fields` are returned, once each."""
+    fields = ["export_folder", "iteration", "unused"]
+    fmt = "{export_folder}/{forecast_model}/iter{iteration}/{export_folder}"
+
+    assert forecast_cnfg._format_field_names(fmt, fields) == ("export_folder", "iteration")
+
+
+@pytest.mark.parametrize(
+    ["fmt", "expected"],
+    [
+        ("{import_path.name}/iter{iteration}", "inputs/iter9a"),
+        ("{future_years[0]}/{future_years[1]}", "2038/2043"),
+        ("{import_path.parent.name!s:>8}", " NorMITs"),
+    ],
+)
+def test_format_field_names_attribute_index(fmt: str, expected: str):
+    """Test attribute and index fields are reduced to the name they're looked up on.
+
+    All the names returned should fill in `fmt` with `format_map`.
+    """
+    params = {
+        "import_path": Path("NorMITs/inputs"),
+        "iteration": "9a",
+        "future_years": [2038, 2043],
+    }
+
+    names = forecast_cnfg._format_field_names(fmt, params)
+
+    assert fmt.format_map({name: params[name] for name in names}) == expected
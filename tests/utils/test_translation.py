@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+    Module for testing functions in normits_demand.utils.translation module.
+"""
+
+##### IMPORTS #####
+# Standard imports
+import gc
+
+# Third party imports
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local imports
+from normits_demand.utils import translation
+
+
+##### CONSTANTS #####
+FROM_ZONES = [1, 2, 3]
+TO_ZONES = [1, 2]
+LONG_TRANSLATION = pd.DataFrame({
+    "from": [1, 2, 3, 3],
+    "to": [1, 1, 1, 2],
+    "factor": [1.0, 1.0, 0.5, 0.5],
+})
+WIDE_TRANSLATION = np.array([[1.0, 0.0], [1.0, 0.0], [0.5, 0.5]])
+
+
+##### FUNCTIONS #####
+def test_reindex_square_matrix():
+    """Test reindexing matches pandas, dropping and infilling zones."""
+    matrix = pd.DataFrame(
+        np.arange(16, dtype=float).reshape(4, 4),
+        index=[5, 1, 3, 9],
+        columns=[3, 5, 9, 1],
+    )
+    zones = [1, 2, 3, 5]
+    expected = matrix.reindex(index=zones, columns=zones, fill_value=-1.0)
+
+    np.testing.assert_array_equal(
+        translation._reindex_square_matrix(matrix, zones, infill=-1.0),
+        expected.values,
+    )
+
+
+@pytest.mark.parametrize(
+    ["zones", "infill"],
+    [([1, 2, 3], 0), ([1, 2, 3], 0.0), ([1, 2, 3], np.nan), ([2, 1], 0.0)],
+)
+def test_reindex_square_matrix_dtype(zones: list, infill: float):
+    """Test integer matrices are only promoted when infilled, like pandas."""
+    matrix = pd.DataFrame([[1, 2], [3, 4]], index=[1, 2], columns=[1, 2])
+    expected = matrix.reindex(index=zones, columns=zones, fill_value=infill)
+
+    reindexed = translation._reindex_square_matrix(matrix, zones, infill=infill)
+
+    assert reindexed.dtype == expected.values.dtype
+    np.testing.assert_array_equal(reindexed, expected.values)
+
+
+@pytest.mark.parametrize("duplicate", ["index", "columns"])
+def test_reindex_square_matrix_duplicate_zones(duplicate: str):
+    """Test the correct error is raised for duplicate zones, rather than dropping demand."""
+    labels = {"index": [1, 2], "columns": [1, 2]}
+    labels[duplicate] = [1, 1]
+    matrix = pd.DataFrame([[1.0, 2.0], [3.0, 4.0]], **labels)
+
+    with pytest.raises(ValueError, match="duplicate zones"):
+        translation._reindex_square_matrix(matrix, [1, 2])
+
+
+def test_pandas_matrix_zone_translation():
+    """Test a pandas matrix is translated to the expected values."""
+    matrix = pd.DataFrame(
+        np.arange(9, dtype=float).reshape(3, 3),
+        index=FROM_ZONES,
+        columns=FROM_ZONES,
+    )
+    expected = pd.DataFrame(
+        WIDE_TRANSLATION.T @ matrix.values @ WIDE_TRANSLATION,
+        index=TO_ZONES,
+        columns=TO_ZONES,
+    )
+
+    translated = translation.pandas_matrix_zone_translation(
+        matrix=matrix,
+        translation=LONG_TRANSLATION,
+        from_zone_col="from",
+        to_zone_col="to",
+        factors_col="factor",
+        from_unique_zones=FROM_ZONES,
+        to_unique_zones=TO_ZONES,
+        check_totals=True,
+    )
+    pd.testing.assert_frame_equal(translated, expected)
+
+
+def test_numpy_matrix_zone_translation_bad_shape():
+    """Test the correct error is raised for a non-square matrix."""
+    with pytest.raises(ValueError, match="not square"):
+        translation.numpy_matrix_zone_translation(
+            matrix=np.ones((3, 2)),
+            translation=WIDE_TRANSLATION,
+        )
+
+
+def test_numpy_matrix_zone_translation_batch():
+    """Test batch translation matches translating each matrix in turn."""
+    matrices = np.random.default_rng(0).random((4, 3, 3))
+    expected = np.stack([
+        translation.numpy_matrix_zone_translation(mat, translation=WIDE_TRANSLATION)
+        for mat in matrices
+    ])
+
+    np.testing.assert_allclose(
+        translation.numpy_matrix_zone_translation_batch(
+            matrices,
+            translation=WIDE_TRANSLATION,
+            check_totals=True,
+        ),
+        expected,
+    )
+
+
+def test_zone_translator_reuse():
+    """Test a ZoneTranslator gives the same results across matrices."""
+    translator = translation.ZoneTranslator(
+        translation=LONG_TRANSLATION,
+        from_zone_col="from",
+        to_zone_col="to",
+        factors_col="factor",
+        from_unique_zones=FROM_ZONES,
+        to_unique_zones=TO_ZONES,
+    )
+
+    for seed in range(3):
+        matrix = pd.DataFrame(
+            np.random.default_rng(seed).random((3, 3)),
+            index=FROM_ZONES,
+            columns=FROM_ZONES,
+        )
+        np.testing.assert_allclose(
+            translator.translate(matrix).values,
+            WIDE_TRANSLATION.T @ matrix.values @ WIDE_TRANSLATION,
+        )
+
+
+def _zone_translator() -> translation.ZoneTranslator:
+    """ZoneTranslator from FROM_ZONES to TO_ZONES using LONG_TRANSLATION."""
+    return translation.ZoneTranslator(
+        translation=LONG_TRANSLATION,
+        from_zone_col="from",
+        to_zone_col="to",
+        factors_col="factor",
+        from_unique_zones=FROM_ZONES,
+        to_unique_zones=TO_ZONES,
+    )
+
+
+@pytest.mark.parametrize("zones", [FROM_ZONES, FROM_ZONES[:2]])
+def test_zone_translator_integer_matrix(zones: list):
+    """Test integer matrices raise an error, rather than truncating the factors.
+
+    With a float translation_dtype they should translate the same as floats,
+    whether or not any zones need infilling.
+    """
+    translator = _zone_translator()
+    matrix = pd.DataFrame(
+        np.arange(1, len(zones) ** 2 + 1).reshape(len(zones), len(zones)),
+        index=zones,
+        columns=zones,
+    )
+
+    with pytest.raises(ValueError, match="floating point"):
+        translator.translate(matrix)
+
+    pd.testing.assert_frame_equal(
+        translator.translate(matrix, translation_dtype=np.float64),
+        translator.translate(matrix.astype(np.float64)),
+    )
+
+
+def test_zone_translator_integer_matrix_nan_infill():
+    """Test a NaN infill on an integer matrix is kept as NaN, not the minimum integer.
+
+    NaN spreads to every translated value, as it's multiplied by zero factors.
+    """
+    matrix = pd.DataFrame([[1, 2], [3, 4]], index=[1, 2], columns=[1, 2])
+
+    translated = _zone_translator().translate(
+        matrix, translation_dtype=np.float64, matrix_infill=np.nan
+    )
+
+    assert translated.isna().all(axis=None)
+
+
+@pytest.mark.parametrize("duplicate", ["index", "columns"])
+def test_zone_translator_duplicate_zones(duplicate: str):
+    """Test the correct error is raised for duplicate zones in the matrix."""
+    labels = {"index": FROM_ZONES, "columns": FROM_ZONES}
+    labels[duplicate] = [1, 1, 2]
+    matrix = pd.DataFrame(np.ones((3, 3)), **labels)
+
+    with pytest.raises(ValueError, match="duplicate zones"):
+        _zone_translator().translate(matrix)
+
+
+@pytest.mark.parametrize("sparse_threshold", [0, 1])
+def test_numpy_matrix_zone_translation_sparse(sparse_threshold: float):
+    """Test the sparse and dense translations give the same results."""
+    matrix = np.random.default_rng(0).random((3, 3))
+    np.testing.assert_allclose(
+        translation.numpy_matrix_zone_translation(
+            matrix,
+            translation=WIDE_TRANSLATION,
+            sparse_threshold=sparse_threshold,
+        ),
+        WIDE_TRANSLATION.T @ matrix @ WIDE_TRANSLATION,
+    )
+
+
+@pytest.mark.parametrize("out_order", ["C", "F"])
+def test_numpy_matrix_zone_translation_out_order(out_order: str):
+    """Test the translated matrix is returned in the requested memory layout."""
+    matrix = np.random.default_rng(0).random((3, 3))
+    translated = translation.numpy_matrix_zone_translation(
+        matrix,
+        translation=WIDE_TRANSLATION,
+        out_order=out_order,
+        sparse_threshold=0,
+    )
+
+    assert translated.flags[f"{out_order}_CONTIGUOUS"]
+    np.testing.assert_allclose(translated, WIDE_TRANSLATION.T @ matrix @ WIDE_TRANSLATION)
+
+
+def test_numpy_matrix_zone_translation_bad_out_order():
+    """Test the correct error is raised for an unknown out_order."""
+    with pytest.raises(ValueError, match="out_order"):
+        translation.numpy_matrix_zone_translation(
+            np.ones((3, 3)),
+            translation=WIDE_TRANSLATION,
+            out_order="K",
+        )
+
+
+def test_numpy_matrix_zone_translation_float16_totals():
+    """Test float16 translations aren't failed by the totals check on rounding alone."""
+    matrix = np.random.default_rng(0).random((3, 3)) * 100
+    translated = translation.numpy_matrix_zone_translation(
+        matrix,
+        translation=WIDE_TRANSLATION,
+        translation_dtype=np.float16,
+        check_totals=True,
+    )
+
+    assert translated.dtype == np.float16
+    np.testing.assert_allclose(translated.sum(), matrix.sum(), rtol=1e-2)
+
+
+@pytest.mark.parametrize(
+    ["translate_fn", "array"],
+    [
+        (translation.numpy_matrix_zone_translation, np.arange(9).reshape(3, 3)),
+        (translation.numpy_matrix_zone_translation_batch, np.arange(18).reshape(2, 3, 3)),
+        (translation.numpy_vector_zone_translation, np.array([1, 2, 3])),
+    ],
+)
+def test_zone_translation_integer_dtype(translate_fn, array: np.ndarray):
+    """Test integer inputs aren't translated with truncated integer factors.
+
+    An error should be raised by default, and a float translation_dtype
+    should translate without truncating.
+    """
+    with pytest.raises(ValueError, match="floating point dtype"):
+        translate_fn(array, translation=WIDE_TRANSLATION)
+
+    translated = translate_fn(array, translation=WIDE_TRANSLATION, translation_dtype=np.float64)
+    expected = translate_fn(array.astype(np.float64), translation=WIDE_TRANSLATION)
+    assert translated.dtype == np.float64
+    np.testing.assert_allclose(translated, expected)
+
+
+def test_float64_total_no_overflow():
+    """Test totals are accumulated in float64, past the maximum float16 value."""
+    array = np.ones((300, 300), dtype=np.float16)
+    assert translation._float64_total(array) == 90000
+
+
+def test_lower_memory_matrix_zone_translation(monkeypatch: pytest.MonkeyPatch):
+    """Test the low memory translation matches, with fewer zones than chunk_size."""
+    # Run the chunks in this process, the translation is tiny
+    monkeypatch.setattr(translation.nd.constants, "PROCESS_COUNT", 0)
+    matrix = np.random.default_rng(0).random((3, 3))
+    np.testing.assert_allclose(
+        translation._lower_memory_matrix_zone_translation(
+            matrix,
+            row_translation=WIDE_TRANSLATION,
+            col_translation=WIDE_TRANSLATION,
+            chunk_size=100,
+        ),
+        WIDE_TRANSLATION.T @ matrix @ WIDE_TRANSLATION,
+    )
+
+
+def test_numpy_vector_zone_translation():
+    """Test a vector is translated to the expected values."""
+    vector = np.array([1.0, 2.0, 3.0])
+    np.testing.assert_allclose(
+        translation.numpy_vector_zone_translation(
+            vector, WIDE_TRANSLATION, check_totals=True
+        ),
+        vector @ WIDE_TRANSLATION,
+    )
+
+
+def test_cached_translations_read_only():
+    """Test the cached cast and transposed translations can't be modified."""
+    wide_translation = WIDE_TRANSLATION.copy()
+
+    cast = translation._cast_translation(wide_translation, np.float32)
+    transposed = translation._transposed_translation(wide_translation)
+
+    assert not cast.flags.writeable
+    assert not transposed.flags.writeable
+    np.testing.assert_array_equal(transposed, wide_translation.T)
+    # Repeat calls return the same cached arrays
+    assert translation._cast_translation(wide_translation, np.float32) is cast
+    assert translation._transposed_translation(wide_translation) is transposed
+
+
+def test_cached_translations_released():
+    """Test cached arrays are removed once the translation is garbage collected."""
+    wide_translation = WIDE_TRANSLATION.copy()
+    translation._cast_translation(wide_translation, np.float32)
+    translation._transposed_translation(wide_translation)
+
+    keys = [(id(wide_translation), np.dtype(np.float32).str), (id(wide_translation), "T")]
+    assert all(k in translation._TRANSLATION_CACHE for k in keys)
+
+    del wide_translation
+    gc.collect()
+    assert not any(k in translation._TRANSLATION_CACHE for k in keys)
+
+
+def test_pandas_vector_zone_translation():
+    """Test a pandas vector is translated to the expected values."""
+    vector = pd.DataFrame({"val": [1.0, 2.0, 3.0]}, index=FROM_ZONES)
+    translated = translation.pandas_vector_zone_translation(
+        vector=vector,
+        translation=LONG_TRANSLATION,
+        from_zone_col="from",
+        to_zone_col="to",
+        factors_col="factor",
+        from_unique_zones=FROM_ZONES,
+        to_unique_zones=TO_ZONES,
+        check_totals=True,
+    )
+    expected = pd.DataFrame({"val": vector["val"].values @ WIDE_TRANSLATION}, index=TO_ZONES)
+    pd.testing.assert_frame_equal(translated, expected)
+
+
+@pytest.mark.parametrize("duplicate", ["from_unique_zones", "to_unique_zones"])
+@pytest.mark.parametrize(
+    "translate_fn",
+    [translation.pandas_vector_zone_translation, translation.pandas_matrix_zone_translation],
+)
+def test_pandas_zone_translation_duplicate_zones(translate_fn, duplicate: str):
+    """Test duplicate unique zones raise an error for vectors and matrices."""
+    if translate_fn is translation.pandas_vector_zone_translation:
+        data = pd.DataFrame({"val": [1.0, 2.0, 3.0]}, index=FROM_ZONES)
+    else:
+        data = pd.DataFrame(np.ones((3, 3)), index=FROM_ZONES, columns=FROM_ZONES)
+    zones = {"from_unique_zones": FROM_ZONES, "to_unique_zones": TO_ZONES}
+    zones[duplicate] = zones[duplicate] + zones[duplicate][:1]
+
+    with pytest.raises(ValueError, match="duplicate zones"):
+        translate_fn(
+            data,
+            translation=LONG_TRANSLATION,
+            from_zone_col="from",
+            to_zone_col="to",
+            factors_col="factor",
+            **zones,
+        )